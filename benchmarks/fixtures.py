@@ -0,0 +1,107 @@
+import json
+import os
+from datetime import datetime
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+PDF_KINDS = ("text", "prose", "scanned", "mixed")
+# Kinds with pages that are only images, which need tesseract to process
+OCR_PDF_KINDS = ("scanned", "mixed")
+PAGE_TEXT = (
+    "Minutes of the meeting of the Metropolitan District of Limerick held in the Council Chamber. "
+    "The Cathaoirleach welcomed the members and the public. Planning application reference {reference} "
+    "for the construction of {page} dwellings was considered, together with the roads programme, "
+    "housing allocations, the annual budget and correspondence received since the last meeting."
+)
+
+
+def generate_pdf(kind: str, pages: int) -> bytes:
+    """A PDF of the given kind: text has a text layer on every page, prose is continuation pages of plain
+    paragraphs between a running header and a page number, scanned has only page images so every page
+    needs OCR, and mixed alternates between text and scanned pages."""
+    doc = fitz.open()
+    for page_number in range(1, pages + 1):
+        page = doc.new_page()
+        heading = f"Item {page_number}: Council business"
+        body = PAGE_TEXT.format(reference=f"24/{1000 + page_number}", page=page_number)
+        if kind == "scanned" or (kind == "mixed" and page_number % 2 == 0):
+            _insert_scanned_text(page, heading, body)
+        elif kind == "prose":
+            page.insert_text((72, 36), "Metropolitan District of Limerick - Minutes", fontsize=9)
+            page.insert_textbox(fitz.Rect(72, 72, 540, 760), "\n\n".join([body] * 4), fontsize=11)
+            page.insert_text((290, 815), f"Page {page_number} of {pages}", fontsize=9)
+        else:
+            page.insert_text((72, 72), heading, fontsize=16)
+            page.insert_textbox(fitz.Rect(72, 100, 540, 760), body * 4, fontsize=11)
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes
+
+
+def _insert_scanned_text(page: fitz.Page, heading: str, body: str):
+    """Renders the text on a scratch page and places it on this page as an image, like a scan."""
+    scratch = fitz.open()
+    scratch_page = scratch.new_page(width=page.rect.width, height=page.rect.height)
+    scratch_page.insert_text((72, 72), heading, fontsize=16)
+    scratch_page.insert_textbox(fitz.Rect(72, 100, 540, 760), body * 4, fontsize=11)
+    pixmap = scratch_page.get_pixmap(dpi=150, colorspace=fitz.csGRAY)
+    # Scanners usually store pages as JPEG
+    page.insert_image(page.rect, stream=pixmap.tobytes("jpg", jpg_quality=75))
+    scratch.close()
+
+
+class SiteFixtures:
+    """The calendar JSON, meeting pages and PDFs served by the benchmark server.
+
+    The calendar response has the same shape as the views/ajax endpoint of limerick.ie, with the
+    calendar HTML in the data of its fourth command. Meetings are spread over the months from start_date.
+    """
+    def __init__(self, base_url: str, start_date: datetime, months: int, meetings_per_month: int, pages_per_pdf: int):
+        self.base_url = base_url.rstrip("/")
+        self.pdfs: Dict[str, bytes] = {kind: generate_pdf(kind, pages_per_pdf) for kind in PDF_KINDS}
+        self.calendars: Dict[str, str] = {}
+        self.meeting_pages: Dict[str, str] = {}
+        self.empty_calendar = self._calendar([])
+
+        year, month = start_date.year, start_date.month
+        for _ in range(months):
+            meetings = []
+            for meeting_number in range(1, meetings_per_month + 1):
+                slug = f"meeting-{year}-{month:02d}-{meeting_number}"
+                meeting_datetime = datetime(year, month, min(meeting_number, 28), 10)
+                meetings.append((slug, f"Metropolitan District Meeting {meeting_number}", meeting_datetime))
+                # Every kind of PDF appears in each meeting, as agenda, minutes and an appendix
+                self.meeting_pages[slug] = self._meeting_page(slug, [
+                    ("Agenda", "text"),
+                    ("Minutes", "mixed"),
+                    ("Minutes appendix (scanned)", "scanned"),
+                ])
+            self.calendars[f"{year}{month:02d}"] = self._calendar(meetings)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def _calendar(self, meetings: List) -> str:
+        items = "".join(
+            f'<div class="view-item"><a href="/council/whats-on/{slug}">{name}</a>'
+            f'<time class="datetime" datetime="{meeting_datetime:%Y-%m-%dT%H:%M:%SZ}">{meeting_datetime:%H:%M}</time></div>'
+            for slug, name, meeting_datetime in meetings
+        )
+        # A private meeting, which the scraper skips
+        items += '<div class="view-item"><a href="/council/whats-on/private">PRIVATE Meeting</a><time class="datetime" datetime="2000-01-01T10:00:00Z">10:00</time></div>'
+        commands = [{"command": "settings"}, {"command": "add_css"}, {"command": "insert"}, {"command": "insert", "data": f'<div class="view-content">{items}</div>'}]
+        return json.dumps(commands)
+
+    def _meeting_page(self, slug: str, files: List) -> str:
+        # Each meeting links to its own URLs, as on the website, though the content is shared
+        links = "".join(f'<li><a href="{self.base_url}/files/{slug}/{kind}.pdf">{file_name}</a></li>' for file_name, kind in files)
+        return f"<html><body><h1>Meeting</h1><ul>{links}</ul></body></html>"
+
+    def write_pdfs(self, folder: str) -> Dict[str, str]:
+        """Writes one PDF of each kind to the folder, returning their paths by kind."""
+        os.makedirs(folder, exist_ok=True)
+        paths = {}
+        for kind, pdf_bytes in self.pdfs.items():
+            paths[kind] = os.path.join(folder, f"{kind}.pdf")
+            with open(paths[kind], "wb") as pdf_file:
+                pdf_file.write(pdf_bytes)
+        return paths
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.fixtures import OCR_PDF_KINDS, SiteFixtures
+from benchmarks.server import BenchmarkServer
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_FOLDER = os.path.join(REPO_FOLDER, "benchmarks", "results")
+
+
+def run_benchmarks(start_date: datetime, months: int, meetings_per_month: int, pages_per_pdf: int, latency_ms: float, download_workers: int, repeat: int, work_folder: str) -> dict:
+    """Runs every benchmark against a local stand-in for the website, returning their results."""
+    server = BenchmarkServer(latency_seconds=latency_ms / 1000)
+    # Read when the scraper is imported, so the src modules are only imported after this
+    os.environ["LIMERICK_BASE_URL"] = server.base_url
+    from src.logging.file_logger import FileLoggerSingleton
+
+    print(f"Generating {months} months of {meetings_per_month} meetings with {pages_per_pdf} page PDFs...")
+    server.fixtures = SiteFixtures(server.base_url, start_date, months, meetings_per_month, pages_per_pdf)
+    server.start()
+    FileLoggerSingleton(datetime.now().strftime('%Y-%m-%d_%H-%M-%S'), os.path.join(work_folder, "logs"))
+    ocr_available = shutil.which("tesseract") is not None
+    try:
+        meetings, calendar_results = benchmark_calendar(start_date, months)
+        results = {
+            "calendar": calendar_results,
+            "downloader": benchmark_downloader(meetings, os.path.join(work_folder, "downloader"), download_workers),
+            "processor": benchmark_processor(server.fixtures.write_pdfs(os.path.join(work_folder, "pdfs")), repeat, ocr_available),
+            "end_to_end": benchmark_end_to_end(server.base_url, start_date, months, os.path.join(work_folder, "end_to_end")),
+        }
+    finally:
+        server.stop()
+
+    return {
+        "commit": _git_commit(),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(), "tesseract": ocr_available},
+        "settings": {"months": months, "meetings_per_month": meetings_per_month, "pages_per_pdf": pages_per_pdf, "latency_ms": latency_ms, "download_workers": download_workers, "repeat": repeat},
+        "results": results,
+    }
+
+
+def benchmark_calendar(start_date: datetime, months: int):
+    """Times get_public_meetings_for_year_month for each month, returning the meetings found and the results."""
+    from src.download.get_meetings_from_website import get_public_meetings_for_year_month
+
+    meetings = []
+    latencies = []
+    start_time = time.perf_counter()
+    year, month = start_date.year, start_date.month
+    for _ in range(months):
+        call_start_time = time.perf_counter()
+        meetings.extend(get_public_meetings_for_year_month(year, month) or [])
+        latencies.append(time.perf_counter() - call_start_time)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    seconds = time.perf_counter() - start_time
+    return meetings, {"months": months, "meetings": len(meetings), "seconds": seconds, "months_per_second": months / seconds, "latency": _distribution(latencies)}
+
+
+def benchmark_downloader(meetings: List[dict], work_folder: str, download_workers: int) -> dict:
+    """Times MeetingFilesDownloader downloading every meeting, then again when every file is unchanged."""
+    from src.download.meeting_files_downloader import MeetingFilesDownloader
+
+    results = {}
+    for run in ("cold", "warm"):
+        downloader = MeetingFilesDownloader(os.path.join(work_folder, "downloaded"), download_workers=download_workers)
+        run_meetings = [dict(meeting) for meeting in meetings]
+        start_time = time.perf_counter()
+        downloader.download_meeting_files_from_website(run_meetings)
+        seconds = time.perf_counter() - start_time
+        downloader.catalog.close()
+
+        files = [file for meeting in run_meetings for file in meeting.get("files", []) if file["downloaded"]]
+        results[run] = {"meetings": len(run_meetings), "files": len(files), "seconds": seconds, "files_per_second": len(files) / seconds}
+        if run == "cold":
+            total_bytes = sum(_stored_size(downloader.blob_store, file["sha256"]) for file in files)
+            results[run].update({"bytes": total_bytes, "mb_per_second": total_bytes / seconds / 1024 / 1024})
+    return results
+
+
+def benchmark_processor(pdf_paths: Dict[str, str], repeat: int, ocr_available: bool) -> dict:
+    """Times each PDF processor's process on each kind of PDF, skipping those needing OCR without tesseract."""
+    import fitz  # PyMuPDF
+    from src.process.pdf_processors.registry import PDF_PROCESSOR_NAMES, create_pdf_processor
+
+    results = {}
+    for processor_name in PDF_PROCESSOR_NAMES:
+        processor = create_pdf_processor(processor_name)
+        results[processor_name] = {}
+        for kind, pdf_path in pdf_paths.items():
+            if kind in OCR_PDF_KINDS and not ocr_available:
+                results[processor_name][kind] = {"skipped": "tesseract is not installed"}
+                continue
+            with fitz.open(pdf_path) as doc:
+                pages = len(doc)
+            latencies = []
+            for _ in range(repeat):
+                start_time = time.perf_counter()
+                processor.process(pdf_path)
+                latencies.append(time.perf_counter() - start_time)
+            results[processor_name][kind] = {"pages": pages, "pages_per_second": pages * repeat / sum(latencies), "latency": _distribution(latencies)}
+    return results
+
+
+def benchmark_end_to_end(base_url: str, start_date: datetime, months: int, work_folder: str) -> dict:
+    """Times main.py downloading and processing every meeting, in a fresh process as it is normally run."""
+    end_year, end_month = start_date.year + (start_date.month + months - 2) // 12, (start_date.month + months - 2) % 12 + 1
+    os.makedirs(work_folder, exist_ok=True)
+    command = [
+        sys.executable, os.path.join(REPO_FOLDER, "main.py"),
+        "--start-year", str(start_date.year), "--start-month", str(start_date.month),
+        "--end-year", str(end_year), "--end-month", str(end_month),
+        "--download-location", os.path.join(work_folder, "downloaded"),
+        "--output-location", os.path.join(work_folder, "processed"),
+        "--logs-location", os.path.join(work_folder, "logs"),
+        "--cache-location", os.path.join(work_folder, "cache"),
+        "--search-index-location", os.path.join(work_folder, "search.sqlite"),
+    ]
+    environment = dict(os.environ, LIMERICK_BASE_URL=base_url, PYTHONPATH=REPO_FOLDER)
+    start_time = time.perf_counter()
+    completed = subprocess.run(command, cwd=work_folder, env=environment, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start_time
+    if completed.returncode != 0:
+        print(f"main.py failed:\n{completed.stderr}")
+    markdown_files = sum(len([name for name in names if name.endswith(".md") and name != "README.md"]) for _, _, names in os.walk(os.path.join(work_folder, "processed")))
+    return {"exit_code": completed.returncode, "seconds": seconds, "markdown_files": markdown_files}
+
+
+def compare_results(previous: dict, current: dict):
+    """Prints each measurement of the previous results beside the current one."""
+    print(f"{'Measurement':70} {previous['commit'][:10]:>12} {current['commit'][:10]:>12} {'change':>8}")
+    current_values = dict(_flatten(current["results"]))
+    for name, previous_value in _flatten(previous["results"]):
+        current_value = current_values.get(name)
+        if current_value is None:
+            continue
+        change = f"{(current_value - previous_value) / previous_value:+8.1%}" if previous_value else f"{'':>8}"
+        print(f"{name:70} {previous_value:12.4g} {current_value:12.4g} {change}")
+
+
+def _flatten(results: dict, prefix: str = ""):
+    for key, value in results.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield f"{prefix}{key}", value
+
+
+def _distribution(values: List[float]) -> dict:
+    from src.logging.file_logger import _percentile
+
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": _percentile(ordered, 50),
+        "p90": _percentile(ordered, 90),
+        "max": ordered[-1],
+    }
+
+
+def _stored_size(blob_store, sha256: str) -> int:
+    return blob_store.blob_path(sha256).stat().st_size
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_FOLDER, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scraping, downloading and processing against a local stand-in for limerick.ie.")
+    parser.add_argument("--months", type=int, default=3, help="Number of calendar months to serve")
+    parser.add_argument("--meetings-per-month", type=int, default=4, help="Number of meetings in each month, each has a text, mixed and scanned PDF")
+    parser.add_argument("--pages-per-pdf", type=int, default=10, help="Number of pages in each generated PDF")
+    parser.add_argument("--latency-ms", type=float, default=20, help="Delay added to every response to stand in for the network")
+    parser.add_argument("--download-workers", type=int, default=4, help="Number of files to download concurrently")
+    parser.add_argument("--repeat", type=int, default=3, help="Times to process each PDF")
+    parser.add_argument("--output", type=str, default=None, help="File to write the results to, by default a new file in benchmarks/results")
+    parser.add_argument("--compare", type=str, default=None, help="Earlier results file to compare these results with")
+    parser.add_argument("--keep-files", action="store_true", help="Keep the downloaded and processed files")
+    args = parser.parse_args()
+
+    work_folder = tempfile.mkdtemp(prefix="limerick-benchmark-")
+    try:
+        results = run_benchmarks(datetime(2024, 1, 1), args.months, args.meetings_per_month, args.pages_per_pdf, args.latency_ms, args.download_workers, args.repeat, work_folder)
+    finally:
+        if args.keep_files:
+            print(f"Benchmark files kept in {work_folder}")
+        else:
+            shutil.rmtree(work_folder, ignore_errors=True)
+
+    output_path = args.output or os.path.join(RESULTS_FOLDER, f"{datetime.now():%Y-%m-%d_%H-%M-%S}_{results['commit'][:10]}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as results_file:
+        json.dump(results, results_file, indent=2)
+    print(json.dumps(results["results"], indent=2))
+    print(f"Results written to {output_path}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as previous_file:
+            compare_results(json.load(previous_file), results)
@@ -0,0 +1,71 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.fixtures import SiteFixtures
+from src.download.html_scraper import HTML_SCRAPERS, create_html_scraper
+
+REFERENCE_SCRAPER = "soup"
+
+
+def check_parity(pages, repeat: int = 1) -> bool:
+    """Runs every installed scraper over the pages, printing their timings and any results that differ from BeautifulSoup's."""
+    scrapers = {}
+    for name in HTML_SCRAPERS:
+        try:
+            scrapers[name] = create_html_scraper(name)
+        except ImportError:
+            print(f"{name} is not installed, skipping it.")
+
+    reference = scrapers[REFERENCE_SCRAPER]
+    expected = [(reference.calendar_items(html), reference.pdf_links(html)) for _, html in pages]
+    identical = True
+    for name, scraper in scrapers.items():
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            results = [(scraper.calendar_items(html), scraper.pdf_links(html)) for _, html in pages]
+        seconds = (time.perf_counter() - start_time) / repeat
+
+        mismatches = [(page_name, expected_result, result) for (page_name, _), expected_result, result in zip(pages, expected, results) if expected_result != result]
+        print(f"{name:15} {seconds * 1000:9.2f} ms for {len(pages)} pages, {'identical' if not mismatches else f'{len(mismatches)} pages differ'}")
+        for page_name, expected_result, result in mismatches:
+            identical = False
+            print(f"   {page_name}:\n      expected {expected_result}\n      got      {result}")
+    return identical
+
+
+def _fixture_pages():
+    fixtures = SiteFixtures("http://127.0.0.1:8000", datetime(2024, 1, 1), months=2, meetings_per_month=4, pages_per_pdf=1)
+    pages = [(f"calendar {month}", json.loads(calendar)[3]["data"]) for month, calendar in fixtures.calendars.items()]
+    pages += [(f"meeting {slug}", html) for slug, html in fixtures.meeting_pages.items()]
+    return pages
+
+
+def _cached_pages(cache_location: str):
+    """Pages from the response cache, the calendar HTML is taken out of its JSON response."""
+    pages = []
+    for body_path in sorted(glob.glob(os.path.join(cache_location, "**", "*.body"), recursive=True)):
+        with open(body_path, "r", encoding="utf-8", errors="replace") as body_file:
+            body = body_file.read()
+        try:
+            body = json.loads(body)[3]["data"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            pass
+        pages.append((body_path, body))
+    return pages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every HTML scraper finds the same meetings and PDF links as BeautifulSoup, and time them.")
+    parser.add_argument("--cache-location", type=str, default=None, help="Also check the pages in this response cache, e.g. ./data/cache/http")
+    parser.add_argument("--repeat", type=int, default=20, help="Times to scrape the pages, timings are averaged")
+    args = parser.parse_args()
+
+    pages = _fixture_pages()
+    if args.cache_location:
+        pages += _cached_pages(args.cache_location)
+    sys.exit(0 if check_parity(pages, args.repeat) else 1)
@@ -0,0 +1,82 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.fixtures import SiteFixtures
+
+
+class BenchmarkServer:
+    """Serves SiteFixtures over HTTP on localhost in place of limerick.ie.
+
+    Every response is delayed by latency_seconds to stand in for the network. PDFs carry an ETag
+    and answer If-None-Match with 304, as the website's file server does.
+    """
+    def __init__(self, latency_seconds: float = 0.0, port: int = 0):
+        self.latency_seconds = latency_seconds
+        self.fixtures: SiteFixtures = None
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _handler_for(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="benchmark-server", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def respond(self, path: str, headers) -> tuple:
+        """The (status, content type, body, extra headers) for a request path."""
+        with self._lock:
+            self.request_count += 1
+        url = urlparse(path)
+        if url.path == "/views/ajax":
+            month = parse_qs(url.query).get("view_args", [""])[0]
+            calendar = self.fixtures.calendars.get(month, self.fixtures.empty_calendar)
+            return 200, "application/json", calendar.encode("utf-8"), {}
+        if url.path.startswith("/council/whats-on/"):
+            meeting_page = self.fixtures.meeting_pages.get(url.path.rsplit("/", 1)[-1])
+            if meeting_page is None:
+                return 404, "text/plain", b"Not found", {}
+            return 200, "text/html", meeting_page.encode("utf-8"), {}
+        if url.path.startswith("/files/"):
+            kind = url.path.rsplit("/", 1)[-1].removesuffix(".pdf")
+            pdf_bytes = self.fixtures.pdfs.get(kind)
+            if pdf_bytes is None:
+                return 404, "text/plain", b"Not found", {}
+            etag = f'"{hashlib.sha256(pdf_bytes).hexdigest()[:16]}"'
+            if headers.get("If-None-Match") == etag:
+                return 304, "application/pdf", b"", {"ETag": etag}
+            return 200, "application/pdf", pdf_bytes, {"ETag": etag}
+        return 404, "text/plain", b"Not found", {}
+
+
+def _handler_for(server: BenchmarkServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if server.latency_seconds:
+                time.sleep(server.latency_seconds)
+            status, content_type, body, extra_headers = server.respond(self.path, self.headers)
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in extra_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -1,8 +1,193 @@
 import argparse
+import os
+import shutil
+import socket
+import threading
+import time
 from datetime import datetime
+from src.catalog.meeting_catalog import CATALOG_FILE_NAME, MeetingCatalog
+from src.download.blob_store import BlobStore
+from src.download.html_scraper import HTML_SCRAPERS
 from src.download.main import download_meeting_files
-from src.process.main import process_meetings
+from src.pipeline.meeting_pipeline import MeetingPipeline
+from src.process.index_pages import write_index_pages
+from src.process.main import create_meeting_processor, process_meetings
+from src.process.pdf_processors.registry import PDF_PROCESSOR_NAMES
+from src.download.response_cache import ResponseCacheSingleton
 from src.logging.file_logger import FileLoggerSingleton
+from src.logging.pdf_profiler import PROFILERS
+from src.work_queue.work_queue import DEFAULT_LEASE_SECONDS, LeaseLost, WorkQueue
+
+
+def run(args, delete_location: str = None, lease_lost: threading.Event = None):
+    """Downloads and processes the meetings from args.start_year/start_month to args.end_year/end_month.
+    With --delete-downloads-after-complete, delete_location is removed afterwards, by default the whole download location.
+    A worker passes the event set when its lease on the month is lost, the run then stops with LeaseLost."""
+    ocr_cache_location = None if args.no_cache else os.path.join(args.cache_location, "ocr")
+    search_index_location = None if args.no_search_index else args.search_index_location
+    pipeline = None
+    if args.in_memory:
+        args.pipeline = True
+    if args.pipeline and not args.dont_download and not args.dont_process:
+        pipeline = MeetingPipeline(
+            meeting_processor=create_meeting_processor(
+                output_location=args.output_location,
+                process_workers=args.process_workers,
+                force_reprocess=args.force_reprocess,
+                ocr_dpi=args.ocr_dpi,
+                ocr_workers=args.ocr_workers,
+                ocr_cache_location=ocr_cache_location,
+                pdf_processor=args.pdf_processor,
+                search_index_location=search_index_location,
+                profiler=args.profile,
+            ),
+            download_location=args.download_location,
+            output_location=args.output_location,
+            blob_store=BlobStore(os.path.join(args.download_location, ".store")),
+            file_filter=args.file_filter,
+            max_pending_meetings=args.max_pending_meetings,
+            delete_processed_downloads=args.delete_downloads_after_complete,
+        )
+    
+    if(not args.dont_download):        
+        try:
+            download_meeting_files(
+                start_year=args.start_year,
+                start_month=args.start_month,
+                end_year=args.end_year,
+                end_month=args.end_month,
+                meeting_filter=args.meeting_filter,
+                file_filter=args.file_filter,
+                download_location=args.download_location,
+                download_workers=args.download_workers,
+                download_host_limit=args.download_host_limit,
+                request_timeout=args.request_timeout,
+                request_retries=args.request_retries,
+                calendar_workers=args.calendar_workers,
+                cache_location=None if args.no_cache else args.cache_location,
+                cache_ttl_hours=args.cache_ttl_hours,
+                cache_immutable_after_months=args.cache_immutable_after_months,
+                download_buffer_kb=args.download_buffer_kb,
+                blob_store=pipeline.blob_store if pipeline else None,
+                on_meeting_downloaded=pipeline.submit if pipeline else None,
+                in_memory=args.in_memory and pipeline is not None,
+                in_memory_limit_mb=args.in_memory_limit_mb,
+                html_scraper=args.html_scraper,
+                stop_event=lease_lost,
+            )
+        finally:
+            if pipeline:
+                pipeline.close()
+    _check_lease(lease_lost)
+        
+    if(not args.dont_process and not pipeline):        
+        process_meetings(
+            start_year=args.start_year,
+            start_month=args.start_month,
+            end_year=args.end_year,
+            end_month=args.end_month,
+            meeting_filter=args.meeting_filter,
+            file_filter=args.file_filter,
+            download_location=args.download_location,
+            output_location=args.output_location,
+            process_workers=args.process_workers,
+            force_reprocess=args.force_reprocess,
+            ocr_dpi=args.ocr_dpi,
+            ocr_workers=args.ocr_workers,
+            ocr_cache_location=ocr_cache_location,
+            pdf_processor=args.pdf_processor,
+            rebuild_catalog=args.rebuild_catalog,
+            index_pages=args.index_pages,
+            search_index_location=search_index_location,
+            profiler=args.profile,
+        )
+    elif pipeline and args.index_pages:
+        catalog = MeetingCatalog(os.path.join(args.download_location, CATALOG_FILE_NAME))
+        write_index_pages(catalog, args.output_location, list(range(args.start_year, args.end_year + 1)))
+        catalog.close()
+
+    if(args.delete_downloads_after_complete):
+        # Another worker that took the month over may still be using its downloads
+        _check_lease(lease_lost)
+        delete_location = delete_location or args.download_location
+        if os.path.exists(delete_location):
+            print(f"Removing download location {delete_location}")
+            if os.path.abspath(delete_location) == os.path.abspath(args.download_location):
+                shutil.rmtree(delete_location)
+            else:
+                _delete_month_downloads(args.download_location, delete_location)
+        else:
+            print(f"Download location {delete_location} does not exist, skipping deletion.")
+
+
+def _delete_month_downloads(download_location: str, month_folder: str):
+    """Removes a month's meeting folders and their catalog entries, and frees stored PDFs no other month links to."""
+    catalog = MeetingCatalog(os.path.join(download_location, CATALOG_FILE_NAME))
+    meetings = catalog.remove_meetings(month_folder)
+    catalog.close()
+    shutil.rmtree(month_folder)
+    blob_store = BlobStore(os.path.join(download_location, ".store"))
+    for meeting in meetings:
+        for file in meeting["files"]:
+            if file.get("sha256"):
+                blob_store.release(file["sha256"])
+
+
+def _check_lease(lease_lost: threading.Event = None):
+    if lease_lost is not None and lease_lost.is_set():
+        raise LeaseLost("Lease on the month was lost, another worker may be working on it")
+
+
+def run_coordinator(args):
+    """Queues each month of the requested range in the work queue for workers to claim."""
+    work_queue = WorkQueue(args.work_queue, args.lease_seconds)
+    if args.rebuild_catalog:
+        # Rebuilt once here rather than by every worker
+        catalog = MeetingCatalog(os.path.join(args.download_location, CATALOG_FILE_NAME))
+        catalog.rebuild()
+        catalog.close()
+    added = work_queue.add_months(datetime(args.start_year, args.start_month, 1), datetime(args.end_year, args.end_month, 1))
+    print(f"🗂️ Queued {added} new months in {args.work_queue}, months by status: {work_queue.status_counts()}")
+    work_queue.close()
+
+
+def run_worker(args):
+    """Claims months from the work queue and runs each, until every month is done or failed."""
+    work_queue = WorkQueue(args.work_queue, args.lease_seconds)
+    print(f"👷 Worker {args.worker_id} taking months from {args.work_queue}")
+    while True:
+        claimed = work_queue.claim(args.worker_id)
+        if claimed is None:
+            if not work_queue.status_counts().get("claimed"):
+                break
+            # Other workers still hold months, wait in case one of them stops heartbeating
+            time.sleep(min(args.lease_seconds / 4, 30))
+            continue
+        unit, year, month = claimed
+        print(f"👷 Worker {args.worker_id} claimed {unit}")
+        month_args = argparse.Namespace(**{**vars(args), "start_year": year, "start_month": month, "end_year": year, "end_month": month, "rebuild_catalog": False})
+        try:
+            with work_queue.keep_alive(unit, args.worker_id) as lease_lost:
+                # Only this month's folder is deleted, other workers' months share the download location
+                run(month_args, delete_location=os.path.join(args.download_location, f"{year}", f"{month:02d}"), lease_lost=lease_lost)
+        except LeaseLost as e:
+            # The month is left to whichever worker holds it now, or to the next claim once the lease runs out
+            print(f"\033[91m❌ Worker {args.worker_id} stopped working on {unit}: {e}\033[0m")
+            continue
+        except KeyboardInterrupt:
+            work_queue.release(unit, args.worker_id, "Worker was interrupted")
+            raise
+        except Exception as e:
+            print(f"\033[91m❌ Worker {args.worker_id} failed on {unit}: {e}\033[0m")
+            work_queue.release(unit, args.worker_id, f"{type(e).__name__}: {e}")
+            continue
+        if not work_queue.complete(unit, args.worker_id):
+            print(f"\033[91m❌ Worker {args.worker_id} finished {unit} after losing its lease, another worker may have worked on it too\033[0m")
+    print(f"👷 No months left to claim, months by status: {work_queue.status_counts()}")
+    for unit, error in work_queue.failed_units():
+        print(f"\033[91m❌ {unit} failed: {error}\033[0m")
+    work_queue.close()
+
 
 if __name__ == "__main__":
     script_start_time = datetime.now()
@@ -20,6 +205,36 @@ if __name__ == "__main__":
     parser.add_argument("--dont-download", action="store_true", help="Do no download new files, process existing files only")
     parser.add_argument("--dont-process", action="store_true", help="Do not process files to markdown")
     parser.add_argument("--delete-downloads-after-complete", action="store_true", help="Delete downloaded files after processing")
+    parser.add_argument("--download-workers", type=int, default=4, help="Number of files to download concurrently")
+    parser.add_argument("--download-host-limit", type=int, default=4, help="Maximum concurrent requests to a single host, fewer are sent while the host is slow or throttling")
+    parser.add_argument("--request-timeout", type=float, default=60, help="Seconds to wait for a server to respond before retrying")
+    parser.add_argument("--request-retries", type=int, default=4, help="Times to retry a request that times out, fails to connect or gets a 429/5xx response")
+    parser.add_argument("--calendar-workers", type=int, default=4, help="Number of calendar months to fetch concurrently")
+    parser.add_argument("--cache-location", type=str, default="./data/cache", help="Location to cache fetched web pages")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch web pages instead of using the cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=12, help="Hours a cached page for a recent month is used before it is revalidated")
+    parser.add_argument("--cache-immutable-after-months", type=int, default=3, help="Cached pages for months older than this are never refetched")
+    parser.add_argument("--download-buffer-kb", type=int, default=1024, help="Size in KB of the buffer used when streaming downloads to disk")
+    parser.add_argument("--html-scraper", type=str, default="auto", choices=["auto", *HTML_SCRAPERS], help="Parser used to scrape web pages, auto uses the fastest installed")
+    parser.add_argument("--process-workers", type=int, default=1, help="Number of PDFs to process in parallel")
+    parser.add_argument("--force-reprocess", action="store_true", help="Process PDFs even if their markdown is up to date")
+    parser.add_argument("--ocr-dpi", type=int, default=300, help="Resolution scanned pages are rendered at for OCR")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="Number of pages of a PDF to OCR in parallel")
+    parser.add_argument("--pdf-processor", type=str, default="fitz", choices=PDF_PROCESSOR_NAMES, help="Processor used to convert PDFs to markdown")
+    parser.add_argument("--pipeline", action="store_true", help="Process each meeting as soon as it is downloaded instead of after all downloads")
+    parser.add_argument("--max-pending-meetings", type=int, default=8, help="In pipeline mode, the most downloaded meetings waiting to be processed at once")
+    parser.add_argument("--in-memory", action="store_true", help="Process PDFs straight from the downloaded bytes without saving them to the download location, implies --pipeline")
+    parser.add_argument("--in-memory-limit-mb", type=int, default=64, help="In in-memory mode, PDFs larger than this are held in a temporary file instead of memory")
+    parser.add_argument("--rebuild-catalog", action="store_true", help="Rebuild the catalog of downloaded meetings from the download location before processing")
+    parser.add_argument("--index-pages", action="store_true", help="Write a README.md index for each processed year and month")
+    parser.add_argument("--search-index-location", type=str, default="./data/search.sqlite", help="Location of the full-text search index of extracted text")
+    parser.add_argument("--no-search-index", action="store_true", help="Do not add extracted text to the search index")
+    parser.add_argument("--profile", type=str, default=None, choices=PROFILERS, help="Profile PDF processing, writing a profile per process to the logs location")
+    parser.add_argument("--work-queue", type=str, default=None, help="Work queue shared by --coordinator and --worker runs, on a volume all of them can reach")
+    parser.add_argument("--coordinator", action="store_true", help="Queue each month of the range in the work queue for workers, then exit")
+    parser.add_argument("--worker", action="store_true", help="Download and process months claimed from the work queue until none are left")
+    parser.add_argument("--worker-id", type=str, default=f"{socket.gethostname()}-{os.getpid()}", help="Name of this worker in the work queue")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS, help="Seconds without a heartbeat after which a worker's month is given to another worker")
     args = parser.parse_args()
 
     # Handle disabling file filter
@@ -31,34 +246,15 @@ if __name__ == "__main__":
     logs_folder = args.logs_location
     FileLoggerSingleton(run_id, logs_folder) 
     
-    if(not args.dont_download):        
-        download_meeting_files(
-            start_year=args.start_year,
-            start_month=args.start_month,
-            end_year=args.end_year,
-            end_month=args.end_month,
-            meeting_filter=args.meeting_filter,
-            file_filter=args.file_filter,
-            download_location=args.download_location,
-        )
-        
-    if(not args.dont_process):        
-        process_meetings(
-            start_year=args.start_year,
-            start_month=args.start_month,
-            end_year=args.end_year,
-            end_month=args.end_month,
-            meeting_filter=args.meeting_filter,
-            file_filter=args.file_filter,
-            download_location=args.download_location,
-            output_location=args.output_location,
-        )
+    if (args.coordinator or args.worker) and not args.work_queue:
+        parser.error("--coordinator and --worker need a --work-queue")
+    if args.coordinator:
+        run_coordinator(args)
+    elif args.worker:
+        run_worker(args)
+    else:
+        run(args)
 
-    if(args.delete_downloads_after_complete):
-        import shutil
-        import os
-        if os.path.exists(args.download_location):
-            print(f"Removing download location {args.download_location}")
-            shutil.rmtree(args.download_location)
-        else:
-            print(f"Download location {args.download_location} does not exist, skipping deletion.")
\ No newline at end of file
+    if ResponseCacheSingleton._instance:
+        ResponseCacheSingleton._instance.print_stats()
+    FileLoggerSingleton._instance.print_metrics_summary()
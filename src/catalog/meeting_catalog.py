@@ -0,0 +1,162 @@
+import glob
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.types.meeting_details import MeetingDetails
+from src.utils.database import connect, meeting_filter_clause
+
+CATALOG_FILE_NAME = ".catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    folder TEXT PRIMARY KEY,
+    meeting_name TEXT NOT NULL,
+    meeting_datetime TEXT NOT NULL,
+    href TEXT
+);
+CREATE INDEX IF NOT EXISTS meetings_by_datetime ON meetings (meeting_datetime);
+CREATE TABLE IF NOT EXISTS files (
+    folder TEXT NOT NULL REFERENCES meetings (folder) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    display_text TEXT,
+    file_name TEXT NOT NULL,
+    url TEXT,
+    downloaded INTEGER NOT NULL,
+    sha256 TEXT,
+    PRIMARY KEY (folder, position)
+);
+"""
+
+
+class MeetingCatalog:
+    """An SQLite index of the downloaded meetings and their files, kept alongside the meeting folders.
+
+    The downloader records each meeting as its meeting_details.json is written, so meetings can be found
+    by date and name without walking the folder tree or opening every meeting_details.json.
+    Meetings are keyed by their folder relative to the catalog's folder, e.g. 2024/03/01-Council Meeting.
+    A new catalog is filled from any meeting folders already downloaded.
+    """
+    def __init__(self, catalog_path: str):
+        self.catalog_path = catalog_path
+        self.root_folder = os.path.dirname(os.path.abspath(catalog_path))
+        os.makedirs(self.root_folder, exist_ok=True)
+        is_new = not os.path.exists(catalog_path)
+        # Shared by the downloader and pipeline threads, the lock serialises its use
+        self._connection = connect(catalog_path)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        if is_new:
+            self.rebuild()
+
+    def add_meeting(self, meeting: MeetingDetails, meeting_folder: str):
+        """Adds or replaces a meeting and its files."""
+        with self._lock, self._connection:
+            self._insert_meeting(self._key(meeting_folder), meeting)
+
+    def rebuild(self):
+        """Replaces the catalog's contents with the meeting_details.json files in the folder tree."""
+        meeting_details_paths = sorted(glob.glob(os.path.join(glob.escape(self.root_folder), "[0-9]" * 4, "[0-9]" * 2, "*", "meeting_details.json")))
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM meetings")
+            for meeting_details_path in meeting_details_paths:
+                try:
+                    with open(meeting_details_path, "r", encoding="utf-8") as details_file:
+                        meeting = json.load(details_file)
+                except (OSError, ValueError) as e:
+                    print(f"Could not read {meeting_details_path}, leaving it out of the catalog: {e}")
+                    continue
+                self._insert_meeting(self._key(os.path.dirname(meeting_details_path)), meeting)
+        print(f"Catalogued {len(meeting_details_paths)} meetings in {self.catalog_path}")
+
+    def find_meetings(self, start_date: datetime, end_date: datetime, meeting_filter: List[str] = None) -> List[Tuple[str, MeetingDetails]]:
+        """The (folder, meeting details) of meetings from start_date up to but not including end_date, in folder order.
+        With meeting_filter, only meetings whose name contains one of the words (case insensitive)."""
+        query = "SELECT folder, meeting_name, meeting_datetime, href FROM meetings WHERE meeting_datetime >= ? AND meeting_datetime < ?"
+        parameters = [str(start_date), str(end_date)]
+        if meeting_filter:
+            filter_clause, filter_parameters = meeting_filter_clause(meeting_filter)
+            query += f" AND {filter_clause}"
+            parameters.extend(filter_parameters)
+        query += " ORDER BY folder"
+
+        with self._lock:
+            meetings = {
+                folder: {"meeting_name": meeting_name, "href": href, "datetime": meeting_datetime, "files": []}
+                for folder, meeting_name, meeting_datetime, href in self._connection.execute(query, parameters)
+            }
+            self._add_files(meetings)
+        return list(meetings.items())
+
+    def get_meeting(self, meeting_folder: str) -> Optional[MeetingDetails]:
+        """The details of the meeting downloaded to meeting_folder, or None if it is not in the catalog."""
+        key = self._key(meeting_folder)
+        with self._lock:
+            row = self._connection.execute("SELECT meeting_name, meeting_datetime, href FROM meetings WHERE folder = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            meetings = {key: {"meeting_name": row[0], "href": row[2], "datetime": row[1], "files": []}}
+            self._add_files(meetings)
+        return meetings[key]
+
+    def remove_meetings(self, folder: str) -> List[MeetingDetails]:
+        """Removes the meetings downloaded under folder, such as a month's folder, returning their details."""
+        prefix = f"{self._key(folder)}/"
+        with self._lock, self._connection:
+            meetings = {
+                meeting_folder: {"meeting_name": meeting_name, "href": href, "datetime": meeting_datetime, "files": []}
+                for meeting_folder, meeting_name, meeting_datetime, href in self._connection.execute(
+                    "SELECT folder, meeting_name, meeting_datetime, href FROM meetings WHERE substr(folder, 1, ?) = ?", (len(prefix), prefix)
+                )
+            }
+            self._add_files(meetings)
+            self._connection.execute("DELETE FROM meetings WHERE substr(folder, 1, ?) = ?", (len(prefix), prefix))
+        return list(meetings.values())
+
+    def count_meetings_by_month(self, start_date: datetime, end_date: datetime) -> Dict[Tuple[int, int], int]:
+        """The number of meetings in each (year, month) from start_date up to but not including end_date."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT substr(meeting_datetime, 1, 7), count(*) FROM meetings WHERE meeting_datetime >= ? AND meeting_datetime < ? GROUP BY 1",
+                (str(start_date), str(end_date)),
+            ).fetchall()
+        return {(int(year_month[:4]), int(year_month[5:7])): count for year_month, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _add_files(self, meetings: Dict[str, MeetingDetails]):
+        if not meetings:
+            return
+        # Meetings are fetched by date first, so their files are looked up by folder in one more query
+        self._connection.execute("CREATE TEMP TABLE IF NOT EXISTS wanted_folders (folder TEXT PRIMARY KEY)")
+        self._connection.execute("DELETE FROM wanted_folders")
+        self._connection.executemany("INSERT INTO wanted_folders VALUES (?)", ((folder,) for folder in meetings))
+        rows = self._connection.execute(
+            "SELECT files.folder, display_text, file_name, url, downloaded, sha256 FROM files JOIN wanted_folders USING (folder) ORDER BY files.folder, position"
+        )
+        for folder, display_text, file_name, url, downloaded, sha256 in rows:
+            file = {"display_text": display_text, "file_name": file_name, "url": url, "downloaded": bool(downloaded)}
+            if sha256:
+                file["sha256"] = sha256
+            meetings[folder]["files"].append(file)
+
+    def _insert_meeting(self, folder: str, meeting: MeetingDetails):
+        self._connection.execute("DELETE FROM meetings WHERE folder = ?", (folder,))
+        self._connection.execute(
+            "INSERT INTO meetings (folder, meeting_name, meeting_datetime, href) VALUES (?, ?, ?, ?)",
+            (folder, meeting["meeting_name"], str(meeting["datetime"]), meeting.get("href")),
+        )
+        self._connection.executemany(
+            "INSERT INTO files (folder, position, display_text, file_name, url, downloaded, sha256) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (folder, position, file.get("display_text"), file["file_name"], file.get("url"), bool(file.get("downloaded")), file.get("sha256"))
+                for position, file in enumerate(meeting.get("files", []))
+            ),
+        )
+
+    def _key(self, meeting_folder: str) -> str:
+        return os.path.relpath(os.path.abspath(meeting_folder), self.root_folder).replace(os.sep, "/")
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.utils.storage import write_atomic
+
+
+class BlobStore:
+    """Content-addressed store of downloaded files named by their SHA-256.
+
+    Meeting folders hold hardlinks into the store so documents shared between meetings are kept once.
+    A manifest entry per URL records the validators of the last download so unchanged files can be skipped.
+    """
+    def __init__(self, store_folder: str):
+        self.store_folder = Path(store_folder)
+        self.blobs_folder = self.store_folder / "blobs"
+        self.manifest_folder = self.store_folder / "manifest"
+        self.temp_folder = self.store_folder / "tmp"
+        for folder in (self.blobs_folder, self.manifest_folder, self.temp_folder):
+            os.makedirs(folder, exist_ok=True)
+        self._url_locks = {}
+        self._lock = threading.Lock()
+        self._link_lock = threading.Lock()
+
+    @contextmanager
+    def url_lock(self, url: str):
+        """Serialises downloads of the same url, which share a scratch file and manifest entry."""
+        with self._lock:
+            url_lock = self._url_locks.setdefault(url, threading.Lock())
+        with url_lock:
+            yield
+
+    def lookup(self, url: str):
+        """Returns the manifest entry for the url if its blob is still in the store."""
+        manifest_path = self._manifest_path(url)
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+                entry = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        if not self.blob_path(entry["sha256"]).exists():
+            return None
+        return entry
+
+    def temp_path(self, url: str) -> Path:
+        """A per-URL scratch path for an in-progress download."""
+        return self.temp_folder / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.part"
+
+    def partial_validator(self, url: str):
+        """The If-Range validator of an interrupted download of the url, or None if it cannot be resumed."""
+        validator_path = self._partial_validator_path(url)
+        if not (validator_path.exists() and self.temp_path(url).exists()):
+            return None
+        with open(validator_path, "r", encoding="utf-8") as validator_file:
+            return validator_file.read() or None
+
+    def save_partial_validator(self, url: str, validator: str):
+        with open(self._partial_validator_path(url), "w", encoding="utf-8") as validator_file:
+            validator_file.write(validator)
+
+    def clear_partial_validator(self, url: str):
+        validator_path = self._partial_validator_path(url)
+        if validator_path.exists():
+            os.remove(validator_path)
+
+    def discard_partial(self, url: str):
+        """Removes an interrupted download of the url so the next download starts from the beginning."""
+        self.clear_partial_validator(url)
+        temp_path = self.temp_path(url)
+        if temp_path.exists():
+            os.remove(temp_path)
+
+    def add(self, url: str, temp_path: Path, sha256: str, response_headers) -> dict:
+        """Moves a completed download into the store and records it in the manifest."""
+        blob_path = self.blob_path(sha256)
+        if blob_path.exists():
+            os.remove(temp_path)
+        else:
+            os.makedirs(blob_path.parent, exist_ok=True)
+            os.replace(temp_path, blob_path)
+        entry = {
+            "url": url,
+            "sha256": sha256,
+            "size": blob_path.stat().st_size,
+            "etag": response_headers.get("ETag"),
+            "last_modified": response_headers.get("Last-Modified"),
+        }
+        self._write_manifest(url, entry)
+        return entry
+
+    def link(self, sha256: str, destination_path: str):
+        """Places the blob at destination_path as a hardlink, copying where hardlinks are not supported."""
+        blob_path = self.blob_path(sha256)
+        if os.path.exists(destination_path) and os.path.samefile(blob_path, destination_path):
+            return
+        temp_destination = f"{destination_path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        with self._link_lock:
+            try:
+                os.link(blob_path, temp_destination)
+            except FileNotFoundError:
+                raise
+            except OSError:
+                shutil.copyfile(blob_path, temp_destination)
+        os.replace(temp_destination, destination_path)
+
+    def release(self, sha256: str):
+        """Removes the blob if no meeting folder links to it any more."""
+        blob_path = self.blob_path(sha256)
+        with self._link_lock:
+            if blob_path.exists() and blob_path.stat().st_nlink == 1:
+                os.remove(blob_path)
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.blobs_folder / sha256[:2] / f"{sha256}.pdf"
+
+    def _partial_validator_path(self, url: str) -> Path:
+        return self.temp_path(url).with_suffix(".validator")
+
+    def _manifest_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.manifest_folder / key[:2] / f"{key}.json"
+
+    def _write_manifest(self, url: str, entry: dict):
+        manifest_path = self._manifest_path(url)
+        os.makedirs(manifest_path.parent, exist_ok=True)
+        write_atomic(manifest_path, json.dumps(entry))
@@ -1,11 +1,50 @@
+import time
+from datetime import datetime
+
 import requests
 
-def fetch_web_content(url):
+from src.download.http_session import HttpSessionSingleton
+from src.download.response_cache import ResponseCacheSingleton
+from src.logging.file_logger import log_metric
+from src.utils.storage import conditional_headers
+
+def fetch_web_content(url, content_date: datetime = None):
+    """Fetches the text of a page, using the response cache when one is configured.
+    content_date is the date the page describes, used to decide if a cached copy can no longer change."""
+    start_time = time.perf_counter()
+    cache = ResponseCacheSingleton._instance
+    cached = cache.lookup(url) if cache else None
+    if cached and cache.is_fresh(cached, content_date):
+        cache.record("hit")
+        _log_fetch(url, "hit", start_time)
+        return cached["body"]
+    
+    http = HttpSessionSingleton.get()
     try:
-        response = requests.get(url, verify=False)
-        response.raise_for_status()
-        
-        return response.text
+        headers = conditional_headers(cached) if cached else {}
+        with http.scheduler.get(url, headers=headers) as response:
+            if cached and response.status_code == 304:
+                cache.mark_revalidated(url, cached)
+                cache.record("revalidated")
+                _log_fetch(url, "revalidated", start_time)
+                return cached["body"]
+            response.raise_for_status()
+            
+            if cache:
+                cache.store(url, response)
+                cache.record("miss")
+            _log_fetch(url, "miss" if cache else "fetched", start_time, len(response.content))
+            return response.text
     except requests.exceptions.RequestException as e:
         print(f"An error occurred: {e}")
-        return None
\ No newline at end of file
+        if cached:
+            print(f"Using cached copy of {url}")
+            cache.record("stale")
+            _log_fetch(url, "stale", start_time)
+            return cached["body"]
+        _log_fetch(url, "failed", start_time)
+        return None
+
+
+def _log_fetch(url: str, outcome: str, start_time: float, received_bytes: int = 0):
+    log_metric("fetch", url=url, outcome=outcome, seconds=round(time.perf_counter() - start_time, 4), bytes=received_bytes)
\ No newline at end of file
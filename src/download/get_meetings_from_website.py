@@ -1,16 +1,20 @@
 
 from datetime import datetime
 import json
+import os
 from typing import List
-from bs4 import BeautifulSoup
 
 from src.download.fetch_web_content import fetch_web_content
+from src.download.html_scraper import get_html_scraper
 from src.types.meeting_details import MeetingDetails
 
+# Overridden to point at a local stand-in for the website, see benchmarks/server.py
+BASE_URL = os.environ.get("LIMERICK_BASE_URL", "https://www.limerick.ie").rstrip("/")
+
 def get_public_meetings_for_year_month(year: int, month:int, meeting_filter_keywords: List[str] = None) -> List[MeetingDetails]:
-    calendar_ajax_url = f"https://www.limerick.ie/views/ajax?view_name=council_meetings_calendar&view_display_id=page_month&view_args={year}{month:02d}"
+    calendar_ajax_url = f"{BASE_URL}/views/ajax?view_name=council_meetings_calendar&view_display_id=page_month&view_args={year}{month:02d}"
     print(f"Fetching data for {year}-{month:02d}...")
-    content = fetch_web_content(calendar_ajax_url)
+    content = fetch_web_content(calendar_ajax_url, content_date=datetime(year, month, 1))
 
     if not content:
         return None   
@@ -21,27 +25,17 @@ def get_public_meetings_for_year_month(year: int, month:int, meeting_filter_keyw
     return meetings
 
 def _get_public_meetings_from_html(html: str, filter_keywords: List[str] = None) -> List[MeetingDetails]:
-    soup = BeautifulSoup(html, "html.parser")
-    
     meeting_details: List[MeetingDetails] = []
     
-    for item in soup.find_all('div', class_='view-item'):
-        
-        link_tag = item.find(
-            'a', 
-            string=lambda text: text and not text.strip().startswith("PRIVATE"),
-            href=lambda href: href and href.startswith("/council/whats-on"))
-        time_tag = item.find('time', class_='datetime')
-
-        if link_tag and time_tag:
-            meeting_name = link_tag.contents[0].strip()
-            if not filter_keywords or any(keyword.lower() in meeting_name.lower() for keyword in filter_keywords):
-                meeting_details.append({
-                    'meeting_name': meeting_name,
-                    'href': f"https://www.limerick.ie{link_tag['href']}",
-                    'datetime': datetime.strptime(time_tag['datetime'], "%Y-%m-%dT%H:%M:%SZ")
-                })
-                print(meeting_name, link_tag['href'], time_tag['datetime'])
+    for link_text, link_href, meeting_datetime in get_html_scraper().calendar_items(html):
+        meeting_name = link_text.strip()
+        if not filter_keywords or any(keyword.lower() in meeting_name.lower() for keyword in filter_keywords):
+            meeting_details.append({
+                'meeting_name': meeting_name,
+                'href': f"{BASE_URL}{link_href}",
+                'datetime': datetime.strptime(meeting_datetime, "%Y-%m-%dT%H:%M:%SZ")
+            })
+            print(meeting_name, link_href, meeting_datetime)
     
     return meeting_details
 
@@ -0,0 +1,182 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+MEETING_LINK_PREFIX = "/council/whats-on"
+
+
+class HtmlScraper(ABC):
+    """Pulls the few elements the downloader needs out of the website's pages.
+
+    Every scraper returns the same results for the same page as the full BeautifulSoup parse,
+    text is as BeautifulSoup's Tag.string would give it. Checked by tests/test_html_scraper.py.
+    """
+    @abstractmethod
+    def calendar_items(self, html: str) -> List[Tuple[str, str, Optional[str]]]:
+        """
+        Finds the meetings in a calendar page.
+
+        Returns:
+            List[Tuple[str, str, str]]: The (link text, link href, time datetime attribute) of each div.view-item
+            with a link to a public meeting page and a time.datetime element. The link text is its single
+            string, as for pdf_links, so markup nested in the link is not part of it.
+        """
+        pass
+
+    @abstractmethod
+    def pdf_links(self, html: str) -> List[Tuple[Optional[str], str]]:
+        """
+        Finds the links to PDFs in a meeting page.
+
+        Returns:
+            List[Tuple[str, str]]: The (link text, or None if the link has no single string, href) of each link.
+        """
+        pass
+
+
+def _is_public_meeting_link(text: Optional[str], href: Optional[str]) -> bool:
+    return bool(text) and not text.strip().startswith("PRIVATE") and bool(href) and href.startswith(MEETING_LINK_PREFIX)
+
+
+def _has_view_item_class(class_attribute) -> bool:
+    # While straining the class attribute has not been split into a list yet
+    classes = class_attribute.split() if isinstance(class_attribute, str) else class_attribute or []
+    return "view-item" in classes
+
+
+def _is_pdf_link(href: Optional[str]) -> bool:
+    return bool(href) and href.endswith(".pdf")
+
+
+class SoupScraper(HtmlScraper):
+    """BeautifulSoup with Python's html.parser. With strain, only the elements of interest are
+    built into the tree, otherwise the whole page is, as the downloader always used to."""
+    def __init__(self, strain: bool = True):
+        # Imported here as BeautifulSoup is slow to import and unused when a C parser is installed
+        from bs4 import BeautifulSoup, SoupStrainer
+        self._beautiful_soup = BeautifulSoup
+        self._soup_strainer = SoupStrainer
+        self.strain = strain
+
+    def calendar_items(self, html: str):
+        parse_only = self._soup_strainer("div", class_=_has_view_item_class) if self.strain else None
+        soup = self._beautiful_soup(html, "html.parser", parse_only=parse_only)
+        items = []
+        for item in soup.find_all('div', class_='view-item'):
+            link_tag = item.find(
+                'a',
+                string=lambda text: text and not text.strip().startswith("PRIVATE"),
+                href=lambda href: href and href.startswith(MEETING_LINK_PREFIX))
+            time_tag = item.find('time', class_='datetime')
+            if link_tag and time_tag:
+                items.append((str(link_tag.string), link_tag['href'], time_tag.get('datetime')))
+        return items
+
+    def pdf_links(self, html: str):
+        parse_only = self._soup_strainer('a', href=_is_pdf_link) if self.strain else None
+        soup = self._beautiful_soup(html, "html.parser", parse_only=parse_only)
+        return [(str(link.string) if link.string is not None else None, link.get('href')) for link in soup.find_all('a', href=_is_pdf_link)]
+
+
+class LxmlScraper(HtmlScraper):
+    """lxml's C HTML parser, queried with XPath."""
+    VIEW_ITEMS = "//div[contains(concat(' ', normalize-space(@class), ' '), ' view-item ')]"
+    DATETIMES = ".//time[contains(concat(' ', normalize-space(@class), ' '), ' datetime ')]"
+
+    def __init__(self):
+        import lxml.html
+        self._lxml_html = lxml.html
+
+    def calendar_items(self, html: str):
+        items = []
+        for item in self._parse(html).xpath(self.VIEW_ITEMS):
+            link_tag = next((link for link in item.iter("a") if _is_public_meeting_link(self._string(link), link.get("href"))), None)
+            time_tags = item.xpath(self.DATETIMES)
+            if link_tag is not None and time_tags:
+                items.append((self._string(link_tag), link_tag.get("href"), time_tags[0].get("datetime")))
+        return items
+
+    def pdf_links(self, html: str):
+        return [(self._string(link), link.get("href")) for link in self._parse(html).iter("a") if _is_pdf_link(link.get("href"))]
+
+    def _parse(self, html: str):
+        if not html.strip():
+            return self._lxml_html.fromstring("<html></html>")
+        return self._lxml_html.document_fromstring(html)
+
+    def _string(self, element) -> Optional[str]:
+        children = list(element)
+        if not children:
+            return element.text
+        if len(children) == 1 and not element.text and not children[0].tail:
+            if not isinstance(children[0].tag, str):  # A comment
+                return children[0].text
+            return self._string(children[0])
+        return None
+
+
+class SelectolaxScraper(HtmlScraper):
+    """selectolax's bindings to the lexbor C HTML parser, queried with CSS selectors."""
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def calendar_items(self, html: str):
+        items = []
+        for item in self._parser(html).css("div.view-item"):
+            link_tag = next((link for link in item.css("a") if _is_public_meeting_link(self._string(link), link.attributes.get("href"))), None)
+            time_tag = item.css_first("time.datetime")
+            if link_tag is not None and time_tag is not None:
+                items.append((self._string(link_tag), link_tag.attributes.get("href"), time_tag.attributes.get("datetime")))
+        return items
+
+    def pdf_links(self, html: str):
+        return [(self._string(link), link.attributes.get("href")) for link in self._parser(html).css("a") if _is_pdf_link(link.attributes.get("href"))]
+
+    def _string(self, node) -> Optional[str]:
+        children = list(node.iter(include_text=True))
+        if len(children) != 1:
+            return None
+        child = children[0]
+        if child.is_text_node:
+            return child.text_content
+        if child.is_comment_node:
+            # comment_content is stripped of whitespace, which BeautifulSoup keeps
+            return child.html[len("<!--"):-len("-->")]
+        return self._string(child)
+
+
+HTML_SCRAPERS = {
+    "soup": lambda: SoupScraper(strain=False),
+    "soup-strained": lambda: SoupScraper(strain=True),
+    "lxml": LxmlScraper,
+    "selectolax": SelectolaxScraper,
+}
+# Tried in order when no scraper is chosen, the C parsers are optional dependencies
+AUTO_ORDER = ("selectolax", "lxml", "soup-strained")
+
+_default_scraper = None
+
+
+def create_html_scraper(name: str = "auto") -> HtmlScraper:
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            try:
+                return HTML_SCRAPERS[candidate]()
+            except ImportError:
+                continue
+    if name not in HTML_SCRAPERS:
+        raise ValueError(f"Unknown HTML scraper '{name}', expected one of: auto, {', '.join(HTML_SCRAPERS)}")
+    return HTML_SCRAPERS[name]()
+
+
+def set_html_scraper(name: str):
+    """Chooses the scraper used for every page, raising ImportError if its parser is not installed."""
+    global _default_scraper
+    _default_scraper = create_html_scraper(name)
+
+
+def get_html_scraper() -> HtmlScraper:
+    global _default_scraper
+    if _default_scraper is None:
+        _default_scraper = create_html_scraper()
+    return _default_scraper
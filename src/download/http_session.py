@@ -0,0 +1,32 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.download.request_scheduler import DEFAULT_TIMEOUT, RequestScheduler
+
+
+class HttpSessionSingleton:
+    """Shared requests session so every fetch and download reuses pooled keep-alive connections,
+    sent through a RequestScheduler that retries and adapts the concurrency to each host."""
+    _instance = None
+
+    def __new__(cls, pool_size: int = 10, per_host_limit: int = 4, timeout=DEFAULT_TIMEOUT, retries: int = 4):
+        if cls._instance is None:
+            cls._instance = super(HttpSessionSingleton, cls).__new__(cls)
+            cls._instance.per_host_limit = per_host_limit
+            cls._instance.session = _create_session(max(pool_size, per_host_limit))
+            cls._instance.scheduler = RequestScheduler(cls._instance.session, max_per_host=per_host_limit, timeout=timeout, retries=retries)
+        return cls._instance
+
+    @classmethod
+    def get(cls) -> "HttpSessionSingleton":
+        """Returns the shared instance, creating one with default settings if needed."""
+        return cls._instance if cls._instance is not None else cls()
+
+
+def _create_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    session.verify = False
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -1,33 +1,78 @@
 import argparse
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import urllib3
 from typing import List
 
+from src.download.blob_store import BlobStore
 from src.download.get_meetings_from_website import get_public_meetings_for_year_month
+from src.download.html_scraper import HTML_SCRAPERS, set_html_scraper
+from src.download.http_session import HttpSessionSingleton
 from src.download.meeting_files_downloader import MeetingFilesDownloader
+from src.download.response_cache import ResponseCacheSingleton
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
         
 
 
-def download_meeting_files(start_year: int, start_month: int, end_year: int, end_month: int, meeting_filter: List[str] = None, file_filter: List[str] = None, download_location: str = "./data/downloaded"):
+def download_meeting_files(start_year: int, start_month: int, end_year: int, end_month: int, meeting_filter: List[str] = None, file_filter: List[str] = None, download_location: str = "./data/downloaded", download_workers: int = 4, download_host_limit: int = 4, request_timeout: float = 60, request_retries: int = 4, calendar_workers: int = 4, cache_location: str = "./data/cache", cache_ttl_hours: float = 12, cache_immutable_after_months: int = 3, download_buffer_kb: int = 1024, blob_store: BlobStore = None, on_meeting_downloaded = None, in_memory: bool = False, in_memory_limit_mb: int = 64, html_scraper: str = "auto", stop_event: threading.Event = None):
     print(f"Fetching meeting minutes from {start_year}-{start_month} to {end_year}-{end_month}...")
     if meeting_filter:
         print(f"Filtering meetings by name containing: '{meeting_filter}' (case insensitive)")
     if file_filter:
         print(f"Filtering files by name containing: '{file_filter}' (case insensitive)")
     
+    set_html_scraper(html_scraper)
     start_date = datetime(start_year, start_month, 1)
     end_date = datetime(end_year, end_month, 1) # Using first date will still include the entire month
-    current_date = start_date
-    downloader = MeetingFilesDownloader(destination_folder = download_location)
+    if cache_location:
+        ResponseCacheSingleton(os.path.join(cache_location, "http"), ttl_seconds=int(cache_ttl_hours * 60 * 60), immutable_after_months=cache_immutable_after_months)
+    HttpSessionSingleton(pool_size=max(calendar_workers + download_workers, download_host_limit), per_host_limit=download_host_limit, timeout=(min(10, request_timeout), request_timeout), retries=request_retries)
+    downloader = MeetingFilesDownloader(
+        destination_folder = download_location,
+        download_workers = download_workers,
+        download_chunk_size = download_buffer_kb * 1024,
+        blob_store = blob_store,
+        on_meeting_downloaded = on_meeting_downloaded,
+        in_memory = in_memory,
+        memory_limit_bytes = in_memory_limit_mb * 1024 * 1024,
+        stop_event = stop_event,
+    )
     
 
-    while current_date <= end_date:
-        meetings = get_public_meetings_for_year_month(current_date.year, current_date.month, meeting_filter)
-        downloader.download_meeting_files_from_website(meetings, file_filter)
-        current_date = _add_month(current_date)
+    # Calendar months are fetched ahead in parallel and handed to the downloader in month order as they resolve.
+    # Only a couple of months per worker are queued ahead, and those not started are cancelled when downloading
+    # stops early, so leaving the pool does not wait for every remaining month to be fetched
+    calendar_workers = max(1, calendar_workers)
+    months = iter(_month_range(start_date, end_date))
+    in_flight = deque()
+    with ThreadPoolExecutor(max_workers=calendar_workers) as executor:
+        try:
+            while True:
+                while len(in_flight) < calendar_workers * 2:
+                    date = next(months, None)
+                    if date is None:
+                        break
+                    in_flight.append(executor.submit(get_public_meetings_for_year_month, date.year, date.month, meeting_filter))
+                if not in_flight or (stop_event is not None and stop_event.is_set()):
+                    break
+                downloader.download_meeting_files_from_website(in_flight.popleft().result(), file_filter)
+        finally:
+            for future in in_flight:
+                future.cancel()
     
     
+def _month_range(start_date: datetime, end_date: datetime) -> List[datetime]:
+    """List the first day of every month from start_date to end_date inclusive."""
+    months = []
+    current_date = start_date
+    while current_date <= end_date:
+        months.append(current_date)
+        current_date = _add_month(current_date)
+    return months
+
 def _add_month(date: datetime) -> datetime:
     """Add one month to the given date."""
     if date.month == 12:
@@ -44,6 +89,17 @@ if __name__ == "__main__":
     parser.add_argument("--end-month", type=int, default=datetime.now().month, help="End month (1-12)")
     parser.add_argument("--meeting-filter", nargs='+', type=str, default=None, help="Filter meetings by names (case insensitive, e.g., 'council budget')")
     parser.add_argument("--file-filter", nargs='*', type=str, default=["agenda", "minutes"], help="Filter files by names (case insensitive, e.g., 'agenda minutes'). Use '--file-filter' with no arguments to disable filtering.")
+    parser.add_argument("--download-workers", type=int, default=4, help="Number of files to download concurrently")
+    parser.add_argument("--download-host-limit", type=int, default=4, help="Maximum concurrent requests to a single host, fewer are sent while the host is slow or throttling")
+    parser.add_argument("--request-timeout", type=float, default=60, help="Seconds to wait for a server to respond before retrying")
+    parser.add_argument("--request-retries", type=int, default=4, help="Times to retry a request that times out, fails to connect or gets a 429/5xx response")
+    parser.add_argument("--calendar-workers", type=int, default=4, help="Number of calendar months to fetch concurrently")
+    parser.add_argument("--cache-location", type=str, default="./data/cache", help="Location to cache fetched web pages")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch web pages instead of using the cache")
+    parser.add_argument("--cache-ttl-hours", type=float, default=12, help="Hours a cached page for a recent month is used before it is revalidated")
+    parser.add_argument("--cache-immutable-after-months", type=int, default=3, help="Cached pages for months older than this are never refetched")
+    parser.add_argument("--download-buffer-kb", type=int, default=1024, help="Size in KB of the buffer used when streaming downloads to disk")
+    parser.add_argument("--html-scraper", type=str, default="auto", choices=["auto", *HTML_SCRAPERS], help="Parser used to scrape web pages, auto uses the fastest installed")
     args = parser.parse_args()
 
     if not args.file_filter:  # If file-filter is provided with no arguments
@@ -56,4 +112,17 @@ if __name__ == "__main__":
         end_month=args.end_month,
         meeting_filter=args.meeting_filter,
         file_filter=args.file_filter,
-    )
\ No newline at end of file
+        download_workers=args.download_workers,
+        download_host_limit=args.download_host_limit,
+        request_timeout=args.request_timeout,
+        request_retries=args.request_retries,
+        calendar_workers=args.calendar_workers,
+        cache_location=None if args.no_cache else args.cache_location,
+        cache_ttl_hours=args.cache_ttl_hours,
+        cache_immutable_after_months=args.cache_immutable_after_months,
+        download_buffer_kb=args.download_buffer_kb,
+        html_scraper=args.html_scraper,
+    )
+    
+    if ResponseCacheSingleton._instance:
+        ResponseCacheSingleton._instance.print_stats()
\ No newline at end of file
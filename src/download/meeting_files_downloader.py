@@ -1,61 +1,160 @@
 import json
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List
-from bs4 import BeautifulSoup
 from src.logging.file_logger import FileLoggerSingleton
+from src.catalog.meeting_catalog import CATALOG_FILE_NAME, MeetingCatalog
+from src.download.blob_store import BlobStore
 from src.download.fetch_web_content import fetch_web_content
-from src.download.pdf_downloader import download_pdf_to_folder
+from src.download.html_scraper import get_html_scraper
+from src.download.pdf_buffer import DEFAULT_MEMORY_LIMIT
+from src.download.pdf_downloader import DEFAULT_CHUNK_SIZE, download_pdf_to_folder, download_pdf_to_memory
 from src.types.meeting_details import MeetingDetails
 
 class MeetingFilesDownloader:
-    def __init__(self, destination_folder: str = None):
+    def __init__(self, destination_folder: str = None, download_workers: int = 4, download_chunk_size: int = DEFAULT_CHUNK_SIZE, blob_store: BlobStore = None, on_meeting_downloaded = None, in_memory: bool = False, memory_limit_bytes: int = DEFAULT_MEMORY_LIMIT, catalog: MeetingCatalog = None, stop_event: threading.Event = None):
+        """on_meeting_downloaded, if given, is called with each meeting, its folder and its PDFs held in memory
+        once its meeting_details.json is written.
+        With in_memory, PDFs are not saved to the meeting folder but handed to on_meeting_downloaded as PdfBuffers
+        keyed by the path they would have been saved to, the callback must close them.
+        Once stop_event is set, no more meetings are saved and downloads not yet started are cancelled."""
         self.destination_folder = Path(destination_folder) if destination_folder else Path.cwd() / 'data/meetings'
+        self.download_workers = max(1, download_workers)
+        self.download_chunk_size = download_chunk_size
+        self.blob_store = blob_store or BlobStore(self.destination_folder / ".store")
+        self.on_meeting_downloaded = on_meeting_downloaded
+        self.in_memory = in_memory
+        self.memory_limit_bytes = memory_limit_bytes
+        self.catalog = catalog or MeetingCatalog(os.path.join(self.destination_folder, CATALOG_FILE_NAME))
+        self.stop_event = stop_event
         
     def download_meeting_files_from_website(self, meetings: List[MeetingDetails], file_filters: List[str] = None):
         if(meetings is None or len(meetings) == 0):
             return
-        for meeting in meetings:
-            datetime = meeting['datetime']
-            folder_name = re.sub(r'[\\/*?:"<>|]', "_", meeting['meeting_name'])
-            destination_path = Path(self.destination_folder) / f"{datetime.year}" / f"{datetime.month:02d}" / f"{datetime.day:02d}-{folder_name}"
-            os.makedirs(destination_path, exist_ok=True)
-            
-            meeting_page_html = fetch_web_content(meeting['href'])
-            
-            
-            soup = BeautifulSoup(meeting_page_html, "html.parser")
-            
-            links = soup.find_all(
-                'a',
-                href=lambda href: href and href.endswith(".pdf"),
-            )
-            
-            files = []
-            for link in links:
-                display_text = link.string.strip() if link.string else "document"
-                file_name = re.sub(r'[\\/*?:"<>|]', "_", display_text) + ".pdf"
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            # Meeting pages and their PDFs share the pool so a month's downloads overlap each other
+            meeting_pages = [executor.submit(fetch_web_content, meeting['href'], meeting['datetime']) for meeting in meetings]
+            pending_meetings = []
+            for meeting, meeting_page in zip(meetings, meeting_pages):
+                if self._stopped():
+                    break
+                destination_path = self.meeting_folder(meeting)
                 
-                file = {
-                    'display_text': display_text,
-                    'file_name': file_name,
-                    'url': link.get('href'),
-                    'downloaded': False
-                }
+                meeting_page_html = meeting_page.result()
+                if meeting_page_html is None:
+                    # Left out of the catalog and without meeting_details.json so the next run tries it again
+                    print(f"\033[91m❌ Failed to fetch meeting page {meeting['href']}, skipping {meeting['meeting_name']}\033[0m")
+                    self._log_failed_download(destination_path, meeting['href'])
+                    continue
+                os.makedirs(destination_path, exist_ok=True)
                 
-                if not file_filters or any(filter_word.lower() in file_name.lower() for filter_word in file_filters):
-                    download_success = download_pdf_to_folder(link, destination_path)
-                    file['downloaded'] = download_success
-                    if(not download_success):
-                        self._log_failed_download(destination_path, file['url'])
+                links = get_html_scraper().pdf_links(meeting_page_html)
+                
+                files = []
+                downloads = []
+                downloads_by_name = {}
+                for link_text, link_href in links:
+                    display_text = display_text_for_link(link_text)
+                    file_name = file_name_for_link(link_text)
+                    
+                    file = {
+                        'display_text': display_text,
+                        'file_name': file_name,
+                        'url': link_href,
+                        'downloaded': False
+                    }
+                    
+                    if matches_file_filter(file_name, file_filters):
+                        # Links sharing a display name write to the same file, so run them in page order
+                        previous_download = downloads_by_name.get(file_name)
+                        download = executor.submit(self._download_after, previous_download, file['url'], file_name, destination_path)
+                        downloads_by_name[file_name] = download
+                        downloads.append((file, download))
 
-                files.append(file)
+                    files.append(file)
+                
+                meeting['files'] = files
+                pending_meetings.append((meeting, destination_path, downloads))
             
-            meeting['files'] = files
-            json_file_path = os.path.join(destination_path, "meeting_details.json")
-            with open(json_file_path, "w", encoding="utf-8") as json_file:
-                json.dump(meeting, json_file, indent=4, default=str)
+            for position, (meeting, destination_path, downloads) in enumerate(pending_meetings):
+                if self._stopped():
+                    print(f"🛑 Downloads stopped, skipping {len(pending_meetings) - position} meetings")
+                    self._cancel_downloads(pending_meetings[position:])
+                    break
+                pdf_buffers = {}
+                for file, download in downloads:
+                    if self.in_memory:
+                        pdf_buffer = download.result()
+                        sha256 = pdf_buffer.sha256 if pdf_buffer else None
+                        if pdf_buffer:
+                            # A later link with the same name replaces the earlier one, as it would on disk
+                            pdf_path = os.path.join(destination_path, file['file_name'])
+                            if pdf_path in pdf_buffers:
+                                pdf_buffers[pdf_path].close()
+                            pdf_buffers[pdf_path] = pdf_buffer
+                    else:
+                        sha256 = download.result()
+                    file['downloaded'] = sha256 is not None
+                    if sha256:
+                        file['sha256'] = sha256
+                    if(not file['downloaded']):
+                        self._log_failed_download(destination_path, file['url'])
+                self._save_meeting_details(meeting, destination_path)
+                self.catalog.add_meeting(meeting, destination_path)
+                if self.on_meeting_downloaded:
+                    self.on_meeting_downloaded(meeting, destination_path, pdf_buffers)
+                else:
+                    for pdf_buffer in pdf_buffers.values():
+                        pdf_buffer.close()
+
+    def _stopped(self) -> bool:
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def _cancel_downloads(self, pending_meetings):
+        """Cancels the downloads not yet started, closing any PDFs already downloaded into memory."""
+        for _, _, downloads in pending_meetings:
+            for _, download in downloads:
+                if not download.cancel() and self.in_memory:
+                    download.add_done_callback(_close_pdf_buffer)
+
+    def meeting_folder(self, meeting: MeetingDetails) -> Path:
+        """The folder a meeting's files and details are saved to."""
+        datetime = meeting['datetime']
+        folder_name = re.sub(r'[\\/*?:"<>|]', "_", meeting['meeting_name'])
+        return Path(self.destination_folder) / f"{datetime.year}" / f"{datetime.month:02d}" / f"{datetime.day:02d}-{folder_name}"
+
+    def _download_after(self, previous_download, url: str, file_name: str, destination_path: Path):
+        if previous_download is not None:
+            previous_download.result()
+        if self.in_memory:
+            return download_pdf_to_memory(url, self.memory_limit_bytes, self.download_chunk_size)
+        return download_pdf_to_folder(url, file_name, destination_path, self.blob_store, self.download_chunk_size)
+
+    def _save_meeting_details(self, meeting: MeetingDetails, destination_path: Path):
+        json_file_path = os.path.join(destination_path, "meeting_details.json")
+        with open(json_file_path, "w", encoding="utf-8") as json_file:
+            json.dump(meeting, json_file, indent=4, default=str)
 
     def _log_failed_download(self, folder_path, failed_download):
-        FileLoggerSingleton._instance.log("failed_download", f"{folder_path}, {failed_download}")
\ No newline at end of file
+        FileLoggerSingleton._instance.log("failed_download", f"{folder_path}, {failed_download}")
+
+
+def display_text_for_link(link_text: str) -> str:
+    return link_text.strip() if link_text else "document"
+
+
+def file_name_for_link(link_text: str) -> str:
+    """The name a linked PDF is saved under, from the link's text."""
+    return re.sub(r'[\\/*?:"<>|]', "_", display_text_for_link(link_text)) + ".pdf"
+
+
+def matches_file_filter(file_name: str, file_filters: List[str] = None) -> bool:
+    return not file_filters or any(filter_word.lower() in file_name.lower() for filter_word in file_filters)
+
+
+def _close_pdf_buffer(download):
+    if not download.cancelled() and download.exception() is None and download.result() is not None:
+        download.result().close()
@@ -0,0 +1,50 @@
+import io
+import os
+import tempfile
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+
+
+class PdfBuffer:
+    """A downloaded PDF held in memory so it can be processed without being written to the download folder.
+
+    Once it grows past max_memory_bytes the content moves to a temporary file, so a very large PDF
+    never has to be held in memory.
+    """
+    def __init__(self, max_memory_bytes: int = DEFAULT_MEMORY_LIMIT, temp_folder: str = None):
+        self.max_memory_bytes = max_memory_bytes
+        self.temp_folder = temp_folder
+        self.sha256 = None
+        self.size = 0
+        self._memory = io.BytesIO()
+        self._temp_file = None
+
+    def write(self, chunk: bytes):
+        if self._temp_file is None and self.size + len(chunk) > self.max_memory_bytes:
+            self._temp_file = tempfile.NamedTemporaryFile(suffix=".pdf", dir=self.temp_folder, delete=False)
+            self._temp_file.write(self._memory.getbuffer())
+            self._memory = None
+        (self._temp_file or self._memory).write(chunk)
+        self.size += len(chunk)
+
+    def reset(self):
+        """Discards the content so the download can be restarted."""
+        self.close()
+        self.sha256 = None
+        self.size = 0
+        self._memory = io.BytesIO()
+
+    def source(self):
+        """The PDF's bytes, or the path of the temporary file holding them."""
+        if self._temp_file is not None:
+            self._temp_file.flush()
+            return self._temp_file.name
+        return self._memory.getvalue()
+
+    def close(self):
+        self._memory = None
+        if self._temp_file is not None:
+            self._temp_file.close()
+            if os.path.exists(self._temp_file.name):
+                os.remove(self._temp_file.name)
+            self._temp_file = None
@@ -1,34 +1,190 @@
+import hashlib
 import os
-from pathlib import Path
 import re
+import time
+from pathlib import Path
 
 import requests
 
+from src.download.blob_store import BlobStore
+from src.download.http_session import HttpSessionSingleton
+from src.download.pdf_buffer import DEFAULT_MEMORY_LIMIT, PdfBuffer
+from src.logging.file_logger import log_metric
+from src.utils.storage import conditional_headers, hash_file
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+RESUME_ATTEMPTS = 3
+
+
+class IncompleteDownloadError(IOError):
+    pass
+
+
+class _ResumeRefused(Exception):
+    pass
+
 
-def download_pdf_to_folder(link: str, folder_path: Path):
+def download_pdf_to_folder(url: str, file_name: str, folder_path: Path, blob_store: BlobStore, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Downloads a PDF into the blob store and links it into folder_path.
+    Returns the SHA-256 of the file, or None if the download failed."""
     # Ensure the folder exists
     os.makedirs(folder_path, exist_ok=True)
     
-    url = link.get('href')
-    
-    link_text = str(link.string).strip() if link.string else "document"
-    
-    # Replace invalid characters in the filename
-    safe_filename = re.sub(r'[\\/*?:"<>|]', "_", link_text) + ".pdf"
-    
-    file_path = os.path.join(folder_path, safe_filename)
+    file_path = os.path.join(folder_path, file_name)
+    start_time = time.perf_counter()
     
     try:
-        print(f"Downloading: {url} to {file_path}")
-        response = requests.get(url, stream=True, verify=False)
-        response.raise_for_status()  # Raise an error for bad HTTP responses
-        
-        with open(file_path, "wb") as file:
-            for chunk in response.iter_content(chunk_size=1024):
-                file.write(chunk)
+        with blob_store.url_lock(url):
+            print(f"Downloading: {url} to {file_path}")
+            entry = blob_store.lookup(url)
+            for attempt in range(1, RESUME_ATTEMPTS + 1):
+                try:
+                    fetched_entry = _download_to_store(url, blob_store, entry, chunk_size)
+                    blob_store.link(fetched_entry["sha256"], file_path)
+                    break
+                except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError, IncompleteDownloadError) as e:
+                    if attempt == RESUME_ATTEMPTS:
+                        raise
+                    print(f"Download of {url} interrupted ({e}), retrying")
+                except FileNotFoundError:
+                    # The stored copy was released after its meeting was processed, so download it again
+                    if attempt == RESUME_ATTEMPTS:
+                        raise
+                    entry = None
         
-        print(f"Downloaded: {file_path}")
+        if fetched_entry is entry:
+            print(f"Unchanged: {file_path}")
+            _log_download(url, "unchanged", start_time)
+        else:
+            print(f"Downloaded: {file_path}")
+            _log_download(url, "downloaded", start_time, fetched_entry["size"])
+    except Exception as e:
+        print(f"\033[91m❌ Failed to download {url}: {e}\033[0m")
+        _log_download(url, "failed", start_time)
+        return None
+    return fetched_entry["sha256"]
+
+
+def download_pdf_to_memory(url: str, max_memory_bytes: int = DEFAULT_MEMORY_LIMIT, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Downloads a PDF into a PdfBuffer instead of the download folder, so it can be processed straight from memory.
+    Returns the buffer, or None if the download failed."""
+    http = HttpSessionSingleton.get()
+    pdf_buffer = PdfBuffer(max_memory_bytes)
+    start_time = time.perf_counter()
+    try:
+        print(f"Downloading: {url} to memory")
+        for attempt in range(1, RESUME_ATTEMPTS + 1):
+            try:
+                with http.scheduler.get(url, stream=True, headers={"Accept-Encoding": "identity"}) as response:
+                    response.raise_for_status()
+                    expected_size = _expected_size(response, 0)
+                    sha256 = hashlib.sha256()
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        sha256.update(chunk)
+                        pdf_buffer.write(chunk)
+                if expected_size is not None and pdf_buffer.size != expected_size:
+                    raise IncompleteDownloadError(f"received {pdf_buffer.size} of {expected_size} bytes")
+                pdf_buffer.sha256 = sha256.hexdigest()
+                break
+            except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError, IncompleteDownloadError) as e:
+                if attempt == RESUME_ATTEMPTS:
+                    raise
+                print(f"Download of {url} interrupted ({e}), retrying")
+                pdf_buffer.reset()
     except Exception as e:
         print(f"\033[91m❌ Failed to download {url}: {e}\033[0m")
+        pdf_buffer.close()
+        _log_download(url, "failed", start_time)
+        return None
+    _log_download(url, "downloaded", start_time, pdf_buffer.size)
+    return pdf_buffer
+
+
+def _download_to_store(url: str, blob_store: BlobStore, entry, chunk_size: int):
+    """Streams the url into the store's scratch file, resuming an earlier partial download where the server allows.
+    Returns the existing manifest entry if the server reports the file is unchanged."""
+    http = HttpSessionSingleton.get()
+    temp_path = blob_store.temp_path(url)
+    # Byte offsets and Content-Length only line up when the body is not re-encoded in transit
+    headers = {"Accept-Encoding": "identity"}
+    if entry:
+        headers.update(conditional_headers(entry))
+    
+    offset = 0
+    validator = blob_store.partial_validator(url)
+    if validator:
+        offset = temp_path.stat().st_size
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = validator
+    
+    try:
+        with http.scheduler.get(url, stream=True, headers=headers) as response:
+            if entry and response.status_code == 304:
+                return entry
+            if offset and not _resumes_at(response, offset):
+                raise _ResumeRefused()
+            response.raise_for_status()  # Raise an error for bad HTTP responses
+            
+            if response.status_code != 206:
+                # Server sent the whole file, either a fresh download or the partial copy is out of date
+                offset = 0
+                blob_store.clear_partial_validator(url)
+                validator = _resume_validator(response)
+                if validator:
+                    blob_store.save_partial_validator(url, validator)
+            expected_size = _expected_size(response, offset)
+            
+            sha256 = hashlib.sha256()
+            if offset:
+                hash_file(temp_path, sha256, chunk_size)
+            with open(temp_path, "ab" if offset else "wb", buffering=chunk_size) as file:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    sha256.update(chunk)
+                    file.write(chunk)
+    except _ResumeRefused:
+        # The partial copy may already be complete, as when the connection dropped after the last byte,
+        # or the server answered with another range. Started again once the response's slot is free
+        print(f"Could not resume download of {url}, starting again")
+        blob_store.discard_partial(url)
+        return _download_to_store(url, blob_store, entry, chunk_size)
+    
+    size = temp_path.stat().st_size
+    if expected_size is not None and size != expected_size:
+        raise IncompleteDownloadError(f"received {size} of {expected_size} bytes")
+    
+    blob_store.clear_partial_validator(url)
+    return blob_store.add(url, temp_path, sha256.hexdigest(), response.headers)
+
+
+def _log_download(url: str, outcome: str, start_time: float, received_bytes: int = 0):
+    log_metric("download", url=url, outcome=outcome, seconds=round(time.perf_counter() - start_time, 4), bytes=received_bytes)
+
+
+def _resume_validator(response):
+    """A validator that can be sent as If-Range to resume this response later, if the server supports ranges."""
+    if response.headers.get("Accept-Ranges", "").lower() != "bytes":
+        return None
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):  # Weak ETags cannot be used with If-Range
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _resumes_at(response, offset: int) -> bool:
+    """Whether the response to a resumed request continues the partial download at offset, or replaces it with the whole file."""
+    if response.status_code == 416:
         return False
-    return True
\ No newline at end of file
+    if response.status_code != 206:
+        return True
+    range_start = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return range_start is not None and int(range_start.group(1)) == offset
+
+
+def _expected_size(response, offset: int):
+    """The full size of the file being downloaded, or None if the server did not say."""
+    if response.status_code == 206:
+        content_range = response.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    content_length = response.headers.get("Content-Length")
+    return offset + int(content_length) if content_length and content_length.isdigit() else None
\ No newline at end of file
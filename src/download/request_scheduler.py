@@ -0,0 +1,178 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+from src.logging.file_logger import log_metric
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# The site is throttling when it answers with these, so it gets a full multiplicative decrease
+THROTTLE_STATUSES = {429, 503}
+DEFAULT_TIMEOUT = (10, 60)  # Seconds to connect, and between bytes of the response
+MAX_RETRY_AFTER_SECONDS = 300
+
+
+class AdaptiveHostLimit:
+    """Limits the requests in flight to one host, adapting the limit AIMD-style as TCP does.
+
+    Each response that arrives in good time adds about one to the limit per round of requests,
+    up to max_limit. A throttling or failed response halves it, and a response much slower than the
+    fastest seen cuts it by a quarter, at most once per cooldown so a burst of failures from the
+    same round only counts once. A pause, from a Retry-After, holds every request to the host.
+    """
+    DECREASE_FACTOR = 0.5
+    SLOW_DECREASE_FACTOR = 0.75
+    # A response is slow when it takes this many times the fastest seen, and at least MIN_SLOW_SECONDS
+    SLOW_LATENCY_RATIO = 4
+    MIN_SLOW_SECONDS = 1.0
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(max(1, (self.max_limit + 1) // 2))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.fastest_seconds = None
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while True:
+                pause = self.paused_until - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(pause)
+                elif self.in_flight >= int(self.limit):
+                    self._condition.wait()
+                else:
+                    self.in_flight += 1
+                    return
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_response(self, seconds: float, throttled: bool = False, failed: bool = False):
+        """Adjusts the limit after a response that took seconds, or a request that failed."""
+        with self._condition:
+            if throttled or failed:
+                self._decrease(self.DECREASE_FACTOR, seconds)
+                return
+            if self.fastest_seconds is None or seconds < self.fastest_seconds:
+                self.fastest_seconds = seconds
+            if seconds > max(self.MIN_SLOW_SECONDS, self.fastest_seconds * self.SLOW_LATENCY_RATIO):
+                self._decrease(self.SLOW_DECREASE_FACTOR, seconds)
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                self._condition.notify_all()
+
+    def pause(self, seconds: float):
+        with self._condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _decrease(self, factor: float, seconds: float):
+        now = time.monotonic()
+        # Requests already in flight when the limit dropped report the same congestion, wait a round for them
+        if now - self._last_decrease < max(1.0, seconds):
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit * factor)
+
+
+class RequestScheduler:
+    """Sends requests with timeouts, an adaptive limit per host and retries with jittered exponential backoff.
+
+    Connection errors, timeouts and 429/5xx responses are retried up to retries times, waiting
+    a random time up to backoff_seconds * 2^attempt, or longer if the server sent a Retry-After.
+    """
+    def __init__(self, session: requests.Session, max_per_host: int = 4, timeout=DEFAULT_TIMEOUT, retries: int = 4, backoff_seconds: float = 0.5, max_backoff_seconds: float = 30):
+        self.session = session
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def host_limit(self, url: str) -> AdaptiveHostLimit:
+        host = urlparse(url).netloc
+        with self._lock:
+            host_limit = self._host_limits.get(host)
+            if host_limit is None:
+                host_limit = AdaptiveHostLimit(self.max_per_host)
+                self._host_limits[host] = host_limit
+        return host_limit
+
+    @contextmanager
+    def get(self, url: str, headers: dict = None, stream: bool = False):
+        """GETs the url, retrying as needed, and yields the response while holding a slot for its host
+        so a streamed body counts against the host's limit. The last response is yielded even when
+        it is an error status, raises the last exception when every attempt fails to connect."""
+        host_limit = self.host_limit(url)
+        for attempt in range(1, self.retries + 2):
+            host_limit.acquire()
+            start_time = time.perf_counter()
+            try:
+                response = self.session.get(url, headers=headers, stream=stream, timeout=self.timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                host_limit.release()
+                seconds = time.perf_counter() - start_time
+                host_limit.on_response(seconds, failed=True)
+                _log_request(url, "failed", attempt, seconds, host_limit)
+                if attempt > self.retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"Request for {url} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            seconds = time.perf_counter() - start_time
+            retry = response.status_code in RETRY_STATUSES and attempt <= self.retries
+            host_limit.on_response(seconds, throttled=response.status_code in THROTTLE_STATUSES, failed=response.status_code >= 500)
+            _log_request(url, "retried" if retry else str(response.status_code), attempt, seconds, host_limit)
+            if retry:
+                response.close()
+                host_limit.release()
+                retry_after = _retry_after_seconds(response)
+                if retry_after:
+                    # The server asked for a break, so every request to it waits, not only this one
+                    host_limit.pause(retry_after)
+                delay = max(self._backoff(attempt), retry_after or 0)
+                print(f"{url} answered {response.status_code}, retrying in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+
+            try:
+                with response:
+                    yield response
+            finally:
+                host_limit.release()
+            return
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+
+def _retry_after_seconds(response):
+    """The delay the server asked for in Retry-After, given as seconds or an HTTP date, or None."""
+    retry_after = response.headers.get("Retry-After")
+    if not retry_after:
+        return None
+    if retry_after.strip().isdigit():
+        seconds = int(retry_after)
+    else:
+        try:
+            seconds = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(MAX_RETRY_AFTER_SECONDS, max(0, seconds))
+
+
+def _log_request(url: str, outcome: str, attempt: int, seconds: float, host_limit: AdaptiveHostLimit):
+    log_metric("request", url=url, outcome=outcome, attempt=attempt, seconds=round(seconds, 4), concurrency_limit=round(host_limit.limit, 2))
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.utils.storage import write_atomic
+
+
+class ResponseCacheSingleton:
+    """On-disk cache of fetched pages keyed by URL.
+
+    Pages cached when their content was already older than `immutable_after_months` are never refetched.
+    Newer pages are served from the cache for `ttl_seconds`, then revalidated with a conditional request.
+    """
+    _instance = None
+
+    def __new__(cls, cache_folder: str, ttl_seconds: int = 12 * 60 * 60, immutable_after_months: int = 3):
+        if cls._instance is None:
+            cls._instance = super(ResponseCacheSingleton, cls).__new__(cls)
+            cls._instance.cache_folder = Path(cache_folder)
+            cls._instance.ttl_seconds = ttl_seconds
+            cls._instance.immutable_after_months = immutable_after_months
+            cls._instance.stats = {"hit": 0, "revalidated": 0, "miss": 0, "stale": 0}
+            cls._instance._lock = threading.Lock()
+            os.makedirs(cls._instance.cache_folder, exist_ok=True)
+        return cls._instance
+
+    def lookup(self, url: str):
+        """Returns the cached entry for the url, or None if it has not been cached."""
+        metadata_path, body_path = self._entry_paths(url)
+        if not (metadata_path.exists() and body_path.exists()):
+            return None
+        try:
+            with open(metadata_path, "r", encoding="utf-8") as metadata_file:
+                entry = json.load(metadata_file)
+            with open(body_path, "r", encoding="utf-8") as body_file:
+                entry["body"] = body_file.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry, content_date: datetime = None) -> bool:
+        """Whether a cached entry can be used without contacting the server."""
+        if content_date is not None and self._is_immutable(content_date, entry["fetched_at"]):
+            return True
+        return time.time() - entry["fetched_at"] < self.ttl_seconds
+
+    def store(self, url: str, response):
+        metadata = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        metadata_path, body_path = self._entry_paths(url)
+        os.makedirs(metadata_path.parent, exist_ok=True)
+        write_atomic(body_path, response.text)
+        write_atomic(metadata_path, json.dumps(metadata))
+
+    def mark_revalidated(self, url: str, entry):
+        """Restarts the TTL of an entry the server confirmed is unchanged."""
+        metadata = {key: value for key, value in entry.items() if key != "body"}
+        metadata["fetched_at"] = time.time()
+        metadata_path, _ = self._entry_paths(url)
+        write_atomic(metadata_path, json.dumps(metadata))
+
+    def record(self, outcome: str):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def print_stats(self):
+        total = sum(self.stats.values())
+        print(
+            f"Response cache: {self.stats['hit']} hits, {self.stats['revalidated']} revalidated, "
+            f"{self.stats['miss']} misses, {self.stats['stale']} stale fallbacks ({total} lookups)"
+        )
+
+    def _is_immutable(self, content_date: datetime, fetched_at: float) -> bool:
+        # Judged at fetch time, a copy taken while the month was still current may be missing later additions
+        fetched_date = datetime.fromtimestamp(fetched_at)
+        months_old = (fetched_date.year - content_date.year) * 12 + (fetched_date.month - content_date.month)
+        return months_old > self.immutable_after_months
+
+    def _entry_paths(self, url: str):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        entry_folder = self.cache_folder / key[:2]
+        return entry_folder / f"{key}.json", entry_folder / f"{key}.body"
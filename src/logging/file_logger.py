@@ -1,6 +1,13 @@
+import json
 import logging
 from logging import Logger
 import os
+import threading
+import time
+from collections import defaultdict
+
+METRICS_LOG_TYPE = "metrics"
+SUMMARY_PERCENTILES = (50, 90, 99)
 
 
 class FileLoggerSingleton:
@@ -11,6 +18,7 @@ class FileLoggerSingleton:
             cls._instance = super(FileLoggerSingleton, cls).__new__(cls)
             cls._instance.run_id = run_id
             cls._instance.logs_folder = logs_folder
+            cls._instance._lock = threading.Lock()
             if not os.path.exists(logs_folder):
                 os.makedirs(logs_folder)
         return cls._instance
@@ -18,11 +26,75 @@ class FileLoggerSingleton:
 
     def log(self, log_type: str, message: str, level=logging.INFO):
         logger = logging.getLogger(log_type)
-        if not logger.handlers:
-            logger.setLevel(logging.DEBUG)
-            file_handler = logging.FileHandler(os.path.join(self.logs_folder, f"{self.run_id}_{log_type}.log"))
-            formatter = logging.Formatter('%(message)s')
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+        # Downloads log from worker threads, so only one of them may attach the handler
+        with self._lock:
+            if not logger.handlers:
+                logger.setLevel(logging.DEBUG)
+                file_handler = logging.FileHandler(os.path.join(self.logs_folder, f"{self.run_id}_{log_type}.log"))
+                formatter = logging.Formatter('%(message)s')
+                file_handler.setFormatter(formatter)
+                logger.addHandler(file_handler)
         
-        logger.log(level, message)
\ No newline at end of file
+        logger.log(level, message)
+
+    def metric(self, stage: str, **fields):
+        """Records a measurement of a stage of the run as a JSON line in the metrics log.
+        Worker processes write to the same file, so the summary covers the whole run."""
+        self.log(METRICS_LOG_TYPE, json.dumps({"time": round(time.time(), 3), "pid": os.getpid(), "stage": stage, **fields}, default=str))
+
+    def print_metrics_summary(self):
+        """Prints the count, percentiles of seconds taken and totals of each stage from the metrics log."""
+        metrics_path = os.path.join(self.logs_folder, f"{self.run_id}_{METRICS_LOG_TYPE}.log")
+        if not os.path.exists(metrics_path):
+            return
+        for handler in logging.getLogger(METRICS_LOG_TYPE).handlers:
+            handler.flush()
+
+        counts = defaultdict(int)
+        seconds_by_stage = defaultdict(list)
+        totals_by_stage = defaultdict(dict)
+        with open(metrics_path, "r", encoding="utf-8") as metrics_file:
+            for line in metrics_file:
+                try:
+                    metric = json.loads(line)
+                except ValueError:
+                    continue
+                # Outcomes such as cache hits and misses take very different times, so are summarised apart
+                stage = f"{metric['stage']} {metric['outcome']}" if "outcome" in metric else metric["stage"]
+                counts[stage] += 1
+                if "seconds" in metric:
+                    seconds_by_stage[stage].append(metric["seconds"])
+                totals = totals_by_stage[stage]
+                for field in ("bytes", "pages", "ocr_pages"):
+                    if field in metric:
+                        totals[field] = totals.get(field, 0) + metric[field]
+                if "depth" in metric:
+                    totals["max depth"] = max(totals.get("max depth", 0), metric["depth"])
+
+        print(f"📊 {'Stage':22} {'count':>7} " + " ".join(f"{f'p{percentile} s':>9}" for percentile in SUMMARY_PERCENTILES) + f" {'max s':>9} {'total s':>10}  Totals")
+        for stage in sorted(counts):
+            seconds = sorted(seconds_by_stage[stage])
+            if seconds:
+                timings = " ".join(f"{_percentile(seconds, percentile):9.3f}" for percentile in SUMMARY_PERCENTILES) + f" {seconds[-1]:9.3f} {sum(seconds):10.2f}"
+            else:
+                timings = " ".join(f"{'-':>9}" for _ in SUMMARY_PERCENTILES) + f" {'-':>9} {'-':>10}"
+            totals = ", ".join(f"{field} {value}" for field, value in totals_by_stage[stage].items())
+            print(f"   {stage:22} {counts[stage]:7d} {timings}  {totals}")
+
+
+def log_message(log_type: str, message: str, level=logging.INFO):
+    """Logs a message when a logger has been set up, see FileLoggerSingleton.log."""
+    if FileLoggerSingleton._instance is not None:
+        FileLoggerSingleton._instance.log(log_type, message, level)
+
+
+def log_metric(stage: str, **fields):
+    """Records a metric when a logger has been set up, see FileLoggerSingleton.metric."""
+    if FileLoggerSingleton._instance is not None:
+        FileLoggerSingleton._instance.metric(stage, **fields)
+
+
+def _percentile(sorted_values, percentile: int) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
@@ -0,0 +1,51 @@
+import cProfile
+import os
+from contextlib import contextmanager
+
+from src.logging.file_logger import FileLoggerSingleton
+
+PROFILERS = ("cprofile", "pyinstrument")
+
+
+class PdfProfiler:
+    """Profiles PDF processing with cProfile or pyinstrument, accumulating over every PDF this process handles.
+
+    The profile is rewritten to the logs folder after each PDF as {run_id}_profile_{pid}.prof, for
+    cProfile, or .html, for pyinstrument, because worker processes can exit without running cleanup.
+    """
+    def __init__(self, profiler: str):
+        if profiler == "cprofile":
+            self._profiler = cProfile.Profile()
+            extension = "prof"
+        elif profiler == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                raise ImportError("pyinstrument is not installed, install it with 'pip install pyinstrument' or profile with cprofile")
+            self._profiler = Profiler()
+            extension = "html"
+        else:
+            raise ValueError(f"Unknown profiler '{profiler}', expected one of: {', '.join(PROFILERS)}")
+        self.profiler = profiler
+
+        logger = FileLoggerSingleton._instance
+        logs_folder = logger.logs_folder if logger else "."
+        run_id = logger.run_id if logger else "run"
+        self.output_path = os.path.join(logs_folder, f"{run_id}_profile_{os.getpid()}.{extension}")
+
+    @contextmanager
+    def profile(self):
+        if self.profiler == "cprofile":
+            self._profiler.enable()
+        else:
+            self._profiler.start()
+        try:
+            yield
+        finally:
+            if self.profiler == "cprofile":
+                self._profiler.disable()
+                self._profiler.dump_stats(self.output_path)
+            else:
+                self._profiler.stop()
+                with open(self.output_path, "w", encoding="utf-8") as profile_file:
+                    profile_file.write(self._profiler.output_html())
@@ -0,0 +1,97 @@
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.download.blob_store import BlobStore
+from src.download.pdf_buffer import PdfBuffer
+from src.logging.file_logger import log_metric
+from src.process.meeting_processor import MeetingProcessor
+from src.types.meeting_details import MeetingDetails
+
+_STOP = object()
+
+
+class MeetingPipeline:
+    """Processes meetings on a background thread as the downloader finishes them.
+
+    At most max_pending_meetings downloaded meetings wait for processing at once, the downloader blocks until
+    one is processed. With delete_processed_downloads each meeting's PDFs are removed once processed,
+    which caps the disk used by downloads regardless of how many months are being fetched.
+    Meetings downloaded in memory are processed from their PdfBuffers, which are closed once processed,
+    so max_pending_meetings also bounds the memory they use.
+    """
+    def __init__(self, meeting_processor: MeetingProcessor, download_location: str, output_location: str, blob_store: BlobStore, file_filter: List[str] = None, max_pending_meetings: int = 8, delete_processed_downloads: bool = False):
+        self.meeting_processor = meeting_processor
+        self.download_folder = os.path.abspath(download_location)
+        self.output_folder = os.path.abspath(output_location)
+        self.blob_store = blob_store
+        self.file_filter = file_filter
+        self.delete_processed_downloads = delete_processed_downloads
+        self._pending_slots = threading.BoundedSemaphore(max(1, max_pending_meetings))
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._process_queue, name="meeting-pipeline", daemon=True)
+        self._thread.start()
+
+    def submit(self, meeting: MeetingDetails, meeting_folder: Path, pdf_buffers: Dict[str, PdfBuffer] = None):
+        """Queues a downloaded meeting for processing, waiting while the pipeline is full."""
+        self._pending_slots.acquire()
+        self._queue.put((meeting, str(meeting_folder), pdf_buffers or {}))
+        log_metric("pipeline_queue", depth=self._queue.qsize())
+
+    def close(self):
+        """Waits for every queued meeting to be processed."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        self.meeting_processor.close()
+
+    def _process_queue(self):
+        stopping = False
+        while not stopping:
+            batch = [self._queue.get()]
+            # Whatever else is already waiting goes in the same batch so the worker pool is kept busy
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = _STOP in batch
+            batch = [item for item in batch if item is not _STOP]
+            if not batch:
+                continue
+
+            start_time = time.perf_counter()
+            try:
+                meeting_folders = [(meeting_folder, self._output_folder_for(meeting_folder)) for _, meeting_folder, _ in batch]
+                self.meeting_processor.process_meetings(
+                    meeting_folders,
+                    self.file_filter,
+                    {pdf_path: pdf_buffer.source() for _, _, pdf_buffers in batch for pdf_path, pdf_buffer in pdf_buffers.items()},
+                    {meeting_folder: meeting for meeting, meeting_folder, _ in batch},
+                )
+                if self.delete_processed_downloads:
+                    for meeting, meeting_folder, _ in batch:
+                        self._delete_downloads(meeting, meeting_folder)
+            except Exception as e:
+                print(f"\033[91m❌ Failed to process meetings {[folder for _, folder, _ in batch]}: {e}\033[0m")
+            finally:
+                for _, _, pdf_buffers in batch:
+                    for pdf_buffer in pdf_buffers.values():
+                        pdf_buffer.close()
+                    self._pending_slots.release()
+                log_metric("pipeline_batch", meetings=len(batch), seconds=round(time.perf_counter() - start_time, 4))
+
+    def _output_folder_for(self, meeting_folder: str) -> str:
+        relative_folder = os.path.relpath(os.path.abspath(meeting_folder), self.download_folder)
+        return os.path.join(self.output_folder, relative_folder)
+
+    def _delete_downloads(self, meeting: MeetingDetails, meeting_folder: str):
+        """Removes a processed meeting's PDFs, keeping meeting_details.json, and frees stored copies nothing else uses."""
+        for file in meeting.get("files", []):
+            pdf_path = os.path.join(meeting_folder, file["file_name"])
+            if os.path.exists(pdf_path):
+                os.remove(pdf_path)
+            if file.get("sha256"):
+                self.blob_store.release(file["sha256"])
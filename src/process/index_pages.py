@@ -0,0 +1,40 @@
+import calendar
+import os
+from datetime import datetime
+from typing import List
+from urllib.parse import quote
+
+from src.catalog.meeting_catalog import MeetingCatalog
+
+
+def write_index_pages(catalog: MeetingCatalog, output_location: str, years: List[int]):
+    """Writes a README.md for each of the years, and each month in them, linking to the meetings in the catalog.
+    Pages are built from the catalog alone, the folder tree is not read. Unchanged pages are not rewritten."""
+    for year in years:
+        meetings_by_month = catalog.count_meetings_by_month(datetime(year, 1, 1), datetime(year + 1, 1, 1))
+        if not meetings_by_month:
+            continue
+
+        year_page = f"# Meetings in {year}\n\n"
+        for (_, month), meeting_count in sorted(meetings_by_month.items()):
+            year_page += f"- [{calendar.month_name[month]}](./{month:02d}/README.md) - {meeting_count} meetings\n"
+
+            month_start = datetime(year, month, 1)
+            month_end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+            month_page = f"# Meetings in {calendar.month_name[month]} {year}\n\n"
+            for folder, meeting in catalog.find_meetings(month_start, month_end):
+                meeting_folder = folder.rsplit("/", 1)[-1]
+                month_page += f"- [{meeting['meeting_name']}](./{quote(meeting_folder)}/README.md) - {meeting['datetime']}\n"
+            _write_page(os.path.join(output_location, str(year), f"{month:02d}", "README.md"), month_page)
+
+        _write_page(os.path.join(output_location, str(year), "README.md"), year_page)
+
+
+def _write_page(page_path: str, content: str):
+    if os.path.exists(page_path):
+        with open(page_path, "r", encoding="utf-8") as page_file:
+            if page_file.read() == content:
+                return
+    os.makedirs(os.path.dirname(page_path), exist_ok=True)
+    with open(page_path, "w", encoding="utf-8") as page_file:
+        page_file.write(content)
@@ -6,48 +6,63 @@ from urllib.parse import quote
 
 # Record the script start time
 script_start_time = datetime.now()
+from src.catalog.meeting_catalog import CATALOG_FILE_NAME, MeetingCatalog
+from src.process.index_pages import write_index_pages
 from src.process.meeting_processor import MeetingProcessor
+from src.logging.pdf_profiler import PROFILERS
+from src.process.pdf_processors.registry import PDF_PROCESSOR_NAMES
+from src.search.search_index import SearchIndex
 
 from typing import List
 
-def process_meetings(start_year: int, start_month: int, end_year: int, end_month: int, meeting_filter: List[str] = None, file_filter: List[str] = None, download_location: str = "./data/downloaded", output_location: str = "./data/processed"):
-    """Processes PDFs, creates folder structure, and generates markdown files."""
+def create_meeting_processor(output_location: str = "./data/processed", process_workers: int = 1, force_reprocess: bool = False, ocr_dpi: int = 300, ocr_workers: int = 1, ocr_cache_location: str = "./data/cache/ocr", pdf_processor: str = "fitz", search_index_location: str = None, profiler: str = None) -> MeetingProcessor:
+    """Creates a MeetingProcessor writing to output_location, tracking processed files in its manifest.
+    With search_index_location, extracted text is also added to the search index there."""
+    output_folder = os.path.abspath(os.path.join(output_location))
+    return MeetingProcessor(
+        process_workers=process_workers,
+        manifest_path=os.path.join(output_folder, ".processing_manifest.json"),
+        force_reprocess=force_reprocess,
+        pdf_processor=pdf_processor,
+        processor_options={"ocr_dpi": ocr_dpi, "ocr_workers": ocr_workers, "ocr_cache_folder": ocr_cache_location},
+        search_index=SearchIndex(search_index_location, output_folder) if search_index_location else None,
+        profiler=profiler,
+    )
+
+def process_meetings(start_year: int, start_month: int, end_year: int, end_month: int, meeting_filter: List[str] = None, file_filter: List[str] = None, download_location: str = "./data/downloaded", output_location: str = "./data/processed", process_workers: int = 1, force_reprocess: bool = False, ocr_dpi: int = 300, ocr_workers: int = 1, ocr_cache_location: str = "./data/cache/ocr", pdf_processor: str = "fitz", rebuild_catalog: bool = False, index_pages: bool = False, search_index_location: str = None, profiler: str = None):
+    """Processes PDFs, creates folder structure, and generates markdown files.
+    Meetings are found through the download location's catalog, rebuilt from the folder tree with rebuild_catalog."""
     
     input_folder = os.path.abspath(os.path.join(download_location))
     output_folder = os.path.abspath(os.path.join(output_location))
     
-    meeting_processor = MeetingProcessor()
+    meeting_processor = create_meeting_processor(output_location, process_workers, force_reprocess, ocr_dpi, ocr_workers, ocr_cache_location, pdf_processor, search_index_location, profiler)
+    catalog = MeetingCatalog(os.path.join(input_folder, CATALOG_FILE_NAME))
+    if rebuild_catalog:
+        catalog.rebuild()
 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
-        
-    for year in range(start_year, end_year + 1):
-        year_path = os.path.join(input_folder, str(year))
-        if not os.path.exists(year_path):
-            print(f"Year folder {year_path} does not exist, skipping year {year}.")
-            continue
-        
-        if year == start_year:
-            start_month_range = start_month
-        else:
-            start_month_range = 1
-            
-        if year == end_year:
-            end_month_range = end_month
-        else:
-            end_month_range = 12
-
-        for month in range(start_month_range, end_month_range + 1):
-            month_folder = f"{month:02d}"
-            month_path = os.path.join(year_path, month_folder)
-            if not os.path.exists(month_path):
-                print(f"Month folder {month_path} does not exist, skipping month {month}.")
-                continue
-            for meeting_folder in sorted(os.listdir(month_path)):
-                meeting_folder_path = os.path.join(month_path, meeting_folder)
-                output_meeting_folder = os.path.join(output_folder, str(year), month_folder, meeting_folder)
-                if os.path.isdir(meeting_folder_path) & (meeting_filter is None or any(filter_word.lower() in meeting_folder.lower() for filter_word in meeting_filter)):                                    
-                    meeting_processor.process_meeting(meeting_folder_path, output_meeting_folder, file_filter)
+    
+    # Using first date of the month after end_month still includes the entire month
+    end_date = datetime(end_year + 1, 1, 1) if end_month == 12 else datetime(end_year, end_month + 1, 1)
+    meeting_folders = []
+    meeting_details = {}
+    for folder, meeting in catalog.find_meetings(datetime(start_year, start_month, 1), end_date, meeting_filter):
+        meeting_folder_path = os.path.join(input_folder, folder)
+        meeting_folders.append((meeting_folder_path, os.path.join(output_folder, folder)))
+        meeting_details[meeting_folder_path] = meeting
+    if not meeting_folders:
+        print(f"No downloaded meetings found from {start_year}-{start_month:02d} to {end_year}-{end_month:02d}.")
+    
+    try:
+        meeting_processor.process_meetings(meeting_folders, file_filter, meeting_details=meeting_details)
+    finally:
+        meeting_processor.close()
+    
+    if index_pages:
+        write_index_pages(catalog, output_folder, list(range(start_year, end_year + 1)))
+    catalog.close()
 
 if __name__ == "__main__":
     # Parse command-line arguments
@@ -58,8 +73,19 @@ if __name__ == "__main__":
     parser.add_argument("--end-month", type=int, default=datetime.now().month, help="End month (1-12)")
     parser.add_argument("--meeting-filter", nargs='+', type=str, default=None, help="Filter meetings by names (case insensitive, e.g., 'council budget')")
     parser.add_argument("--file-filter", nargs='*', type=str, default=None, help="Filter files by names (case insensitive, e.g., 'agenda minutes'). Use '--file-filter' with no arguments to disable filtering.")
+    parser.add_argument("--process-workers", type=int, default=1, help="Number of PDFs to process in parallel")
+    parser.add_argument("--force-reprocess", action="store_true", help="Process PDFs even if their markdown is up to date")
+    parser.add_argument("--ocr-dpi", type=int, default=300, help="Resolution scanned pages are rendered at for OCR")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="Number of pages of a PDF to OCR in parallel")
+    parser.add_argument("--ocr-cache-location", type=str, default="./data/cache/ocr", help="Location to cache OCR results")
+    parser.add_argument("--pdf-processor", type=str, default="fitz", choices=PDF_PROCESSOR_NAMES, help="Processor used to convert PDFs to markdown")
+    parser.add_argument("--rebuild-catalog", action="store_true", help="Rebuild the catalog of downloaded meetings from the download folder before processing")
+    parser.add_argument("--index-pages", action="store_true", help="Write a README.md index for each processed year and month")
+    parser.add_argument("--search-index-location", type=str, default="./data/search.sqlite", help="Location of the full-text search index of extracted text")
+    parser.add_argument("--no-search-index", action="store_true", help="Do not add extracted text to the search index")
+    parser.add_argument("--profile", type=str, default=None, choices=PROFILERS, help="Profile PDF processing, writing a profile per process to the logs location")
     args = parser.parse_args()
     
-    process_meetings(args.start_year, args.start_month, args.end_year, args.end_month, args.meeting_filter, args.file_filter)
+    process_meetings(args.start_year, args.start_month, args.end_year, args.end_month, args.meeting_filter, args.file_filter, process_workers=args.process_workers, force_reprocess=args.force_reprocess, ocr_dpi=args.ocr_dpi, ocr_workers=args.ocr_workers, ocr_cache_location=args.ocr_cache_location, pdf_processor=args.pdf_processor, rebuild_catalog=args.rebuild_catalog, index_pages=args.index_pages, search_index_location=None if args.no_search_index else args.search_index_location, profiler=args.profile)
     
     
\ No newline at end of file
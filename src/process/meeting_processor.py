@@ -1,9 +1,21 @@
+import hashlib
 import json
+import multiprocessing
 import os
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple, Union
 from urllib.parse import quote
-from src.process.pdf_processors.fitz_processor import FitzProcessor
+from src.logging.file_logger import FileLoggerSingleton
+from src.logging.pdf_profiler import PdfProfiler
+from src.process.pdf_processors.registry import create_pdf_processor
+from src.process.processing_manifest import ProcessingManifest
+from src.search.search_index import SearchIndex
+from src.types.meeting_details import MeetingDetails
+from src.utils.storage import hash_file
 
 MEETING_README_TEMPLATE = """# Meeting Details
 
@@ -18,78 +30,301 @@ Files:
 """
 
 class MeetingProcessor:
+    def __init__(self, process_workers: int = 1, manifest_path: str = None, force_reprocess: bool = False, pdf_processor: str = "fitz", processor_options: dict = None, search_index: SearchIndex = None, profiler: str = None):
+        self.process_workers = max(1, process_workers)
+        self.manifest = ProcessingManifest(manifest_path) if manifest_path else None
+        self.force_reprocess = force_reprocess
+        self.pdf_processor_name = pdf_processor
+        self.processor_options = processor_options or {}
+        # Kept for the life of the processor so OCR threads and caches are reused between PDFs
+        self.pdf_processor = create_pdf_processor(pdf_processor, **self.processor_options)
+        self.processor_id = self.pdf_processor.config_id()
+        self.search_index = search_index
+        self.profiler = profiler
+        self._pdf_profiler = None
+        self._executor = None
+
     def process_meeting(self, meeting_folder: str, output_meeting_folder: str, file_filter: List[str] = None):
         """Processes a single meeting folder and generates markdown files."""
+        self.process_meetings([(meeting_folder, output_meeting_folder)], file_filter)
+
+    def process_meetings(self, meeting_folders: List[Tuple[str, str]], file_filter: List[str] = None, pdf_sources: Dict[str, Union[bytes, str]] = None, meeting_details: Dict[str, MeetingDetails] = None):
+        """Processes (meeting_folder, output_meeting_folder) pairs, spreading their PDFs across the worker pool.
+        Each meeting's README.md is written as soon as all of its PDFs are done.
+        pdf_sources maps the path of a PDF that is not in its meeting folder to its content, or a temporary copy of it.
+        meeting_details maps meeting folders to their details, already known from the catalog or downloader,
+        so their meeting_details.json need not be read."""
+        meetings = []
+        for meeting_folder, output_meeting_folder in meeting_folders:
+            known_details = meeting_details.get(meeting_folder) if meeting_details else None
+            meeting = self._read_meeting(meeting_folder, output_meeting_folder, file_filter, pdf_sources or {}, known_details)
+            if meeting:
+                meetings.append(meeting)
+
+        results = self._run_pdf_jobs(job for meeting in meetings for job in meeting["jobs"])
+        for meeting in meetings:
+            processed = []
+            processed_pages = []
+            for md_path, sha256 in meeting["job_outputs"]:
+                extracted, page_texts = next(results)
+                processed.append(extracted)
+                processed_pages.append(page_texts)
+                self._record(md_path, {"sha256": sha256, "processor": self.processor_id, "extracted": extracted})
+            self._write_readme(meeting, processed)
+            if self.search_index:
+                self._index_meeting(meeting, processed, processed_pages)
+            if self.manifest:
+                self.manifest.save_if_due()
+
+    def close(self):
+        """Saves the processing manifest, closes the search index and stops any worker processes."""
+        if self.manifest:
+            self.manifest.save()
+        if self.search_index:
+            self.search_index.close()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _read_meeting(self, meeting_folder: str, output_meeting_folder: str, file_filter: List[str] = None, pdf_sources: Dict[str, Union[bytes, str]] = None, meeting_details: MeetingDetails = None):
+        """Loads meeting_details.json, unless the details are given, and works out which PDFs need processing."""
         print(f"👥 Processing meeting: {meeting_folder}")
-        meeting_details_path = os.path.join(meeting_folder, "meeting_details.json")
-        if os.path.exists(meeting_details_path):
+        if meeting_details is None:
+            meeting_details_path = os.path.join(meeting_folder, "meeting_details.json")
+            if not os.path.exists(meeting_details_path):
+                return None
             with open(meeting_details_path, "r", encoding="utf-8") as details_file:
                 meeting_details = json.load(details_file)
-            
-            if not os.path.exists(output_meeting_folder):
-                os.makedirs(output_meeting_folder)
-
-            # Create a README.md file content for the meeting
-            readme_content = MEETING_README_TEMPLATE.format(
-                meeting_name=meeting_details["meeting_name"],
-                datetime=meeting_details["datetime"],
-                href=meeting_details["href"]
-            )
-            
-
-            files_info = meeting_details.get("files", [])
-            if not files_info:
-                readme_content += "No files available for this meeting."
-        
-            # Process PDFs in the meeting folder
-            for file_info in files_info:
-                file_name = file_info.get("file_name")
-                file_url = file_info.get("url", "#")
-                downloaded = file_info.get("downloaded")
-                
-                processed = False
-                md_file_name = None
-                
-                if downloaded & (file_name.endswith(".pdf")) & (file_filter is None or any(filter_word.lower() in file_name.lower() for filter_word in file_filter)):
-                    pdf_file_path = os.path.join(meeting_folder, file_name)
-                    if os.path.exists(pdf_file_path):
-                        processed = self._process_pdf(pdf_file_path, output_meeting_folder, file_url)
-                        md_file_name = f"{os.path.splitext(os.path.basename(pdf_file_path))[0]}.md"
-                    else:
-                        print(f"❌ File {pdf_file_path} not found, skipping PDF processing.")
-                
-                readme_content += f"{file_name} - [Original file]({file_url})"
-                if processed and md_file_name:
-                    readme_content += f" - [Extracted text](./{quote(md_file_name)})"
+
+        if not os.path.exists(output_meeting_folder):
+            os.makedirs(output_meeting_folder)
+
+        files = []
+        jobs = []
+        job_outputs = []
+        for file_info in meeting_details.get("files", []):
+            file_name = file_info.get("file_name")
+            file_url = file_info.get("url", "#")
+            downloaded = file_info.get("downloaded")
+
+            md_file_name = None
+            sha256 = None
+            extracted = None  # Filled in from the job results when the PDF needs processing
+            if downloaded & (file_name.endswith(".pdf")) & (file_filter is None or any(filter_word.lower() in file_name.lower() for filter_word in file_filter)):
+                pdf_file_path = os.path.join(meeting_folder, file_name)
+                pdf_source = pdf_sources.get(pdf_file_path) if pdf_sources else None
+                md_file_name = f"{os.path.splitext(os.path.basename(pdf_file_path))[0]}.md"
+                md_path = os.path.join(output_meeting_folder, md_file_name)
+                sha256 = file_info.get("sha256")
+                if not sha256 and os.path.exists(pdf_file_path):
+                    sha256 = hash_file(pdf_file_path).hexdigest()
+                up_to_date = self._up_to_date_entry(md_path, sha256)
+                # The index takes each page's text as it is processed, so a document missing from it is processed again
+                if up_to_date and up_to_date["extracted"] and self.search_index and not self.search_index.is_current(md_path, self._source_id(sha256)):
+                    up_to_date = None
+                if up_to_date:
+                    print(f"⏭️ {file_name} unchanged, skipping PDF processing.")
+                    extracted = up_to_date["extracted"]
+                elif pdf_source is not None or os.path.exists(pdf_file_path):
+                    jobs.append((pdf_file_path, output_meeting_folder, file_url, pdf_source, self.search_index is not None))
+                    job_outputs.append((md_path, sha256))
                 else:
-                    readme_content += " - Text not extracted"
-                readme_content += "\n\n"
-                
-                readme_path = os.path.join(output_meeting_folder, "README.md")
-                with open(readme_path, "w", encoding="utf-8") as readme_file:
-                    readme_file.write(readme_content)
-                
-    def _process_pdf(self, pdf_path, output_folder, original_url):
+                    print(f"❌ File {pdf_file_path} not found, skipping PDF processing.")
+                    extracted = False
+            files.append((file_name, file_url, md_file_name, extracted, sha256))
+
+        return {
+            "details": meeting_details,
+            "output_folder": output_meeting_folder,
+            "files": files,
+            "jobs": jobs,
+            "job_outputs": job_outputs,
+        }
+
+    def _up_to_date_entry(self, md_path: str, sha256: str):
+        """The manifest entry for md_path if it was generated from this PDF content by the current processor.
+        A PDF whose text was not extracted has no up to date entry, so it is tried again."""
+        if self.force_reprocess or not self.manifest or not sha256:
+            return None
+        entry = self.manifest.get(md_path)
+        if not entry or entry.get("sha256") != sha256 or entry.get("processor") != self.processor_id:
+            return None
+        # The failure may have been passing, such as a crashed worker or tesseract not being installed
+        if "extracted" in entry and not entry["extracted"]:
+            return None
+        if entry.get("extracted") and not os.path.exists(md_path):
+            return None
+        return entry
+
+    def _record(self, output_path: str, entry: dict):
+        if self.manifest:
+            self.manifest.set(output_path, entry)
+
+    def _write_readme(self, meeting, processed: List[bool]):
+        meeting_details = meeting["details"]
+        # Create a README.md file content for the meeting
+        readme_content = MEETING_README_TEMPLATE.format(
+            meeting_name=meeting_details["meeting_name"],
+            datetime=meeting_details["datetime"],
+            href=meeting_details["href"]
+        )
+
+        if not meeting["files"]:
+            readme_content += "No files available for this meeting."
+
+        results = iter(processed)
+        for file_name, file_url, md_file_name, extracted, _ in meeting["files"]:
+            if md_file_name and extracted is None:
+                extracted = next(results)
+            readme_content += f"{file_name} - [Original file]({file_url})"
+            if md_file_name and extracted:
+                readme_content += f" - [Extracted text](./{quote(md_file_name)})"
+            else:
+                readme_content += " - Text not extracted"
+            readme_content += "\n\n"
+
+        readme_path = os.path.join(meeting["output_folder"], "README.md")
+        readme_hash = hashlib.sha256(readme_content.encode("utf-8")).hexdigest()
+        if self._up_to_date_entry(readme_path, readme_hash) and os.path.exists(readme_path):
+            return
+        with open(readme_path, "w", encoding="utf-8") as readme_file:
+            readme_file.write(readme_content)
+        self._record(readme_path, {"sha256": readme_hash, "processor": self.processor_id})
+
+    def _index_meeting(self, meeting, processed: List[bool], processed_pages: List[List[str]]):
+        """Adds the pages of the meeting's newly processed PDFs to the search index.
+        Unchanged PDFs were only skipped if their document is already indexed from the same PDF and processor."""
+        results = iter(zip(processed, processed_pages))
+        for file_name, file_url, md_file_name, extracted, sha256 in meeting["files"]:
+            if not md_file_name:
+                continue
+            page_texts = None
+            if extracted is None:
+                extracted, page_texts = next(results)
+            md_path = os.path.join(meeting["output_folder"], md_file_name)
+            if not extracted:
+                self.search_index.remove_document(md_path)
+            elif page_texts is not None:
+                self.search_index.add_document(md_path, self._source_id(sha256), meeting["details"], file_name, file_url, page_texts)
+
+    def _source_id(self, sha256: str) -> str:
+        """What a document in the search index was extracted from."""
+        return f"{sha256}:{self.processor_id}"
+
+    def _run_pdf_jobs(self, jobs):
+        """Yields the (extracted, page_texts) result of each (pdf_path, output_folder, original_url, pdf_source, keep_pages) job in order."""
+        if self.process_workers == 1:
+            for job in jobs:
+                yield self._process_pdf(*job)
+            return
+
+        # Only a couple of jobs per worker are queued ahead so a crashed pool takes few jobs down with it
+        in_flight = deque()
+        for job in jobs:
+            executor = self._get_executor()
+            in_flight.append((job, executor, executor.submit(_process_pdf_in_worker, *job)))
+            if len(in_flight) >= self.process_workers * 2:
+                yield self._job_result(*in_flight.popleft())
+        while in_flight:
+            yield self._job_result(*in_flight.popleft())
+
+    def _job_result(self, job, executor, future) -> Tuple[bool, List[str]]:
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            # Any queued job fails with the pool, so rerun each on its own to find the one that crashed
+            if self._executor is executor:
+                executor.shutdown(wait=False)
+                self._executor = None
+            return self._run_isolated(job)
+
+    def _run_isolated(self, job) -> Tuple[bool, List[str]]:
+        pdf_path = job[0]
+        with _create_executor(1, self.pdf_processor_name, self.processor_options, self.profiler) as executor:
+            try:
+                return executor.submit(_process_pdf_in_worker, *job).result()
+            except BrokenProcessPool:
+                print(f"❌ Worker crashed processing {pdf_path}, skipping PDF.")
+                FileLoggerSingleton._instance.log("failed_processing", f"{pdf_path}")
+                return False, None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = _create_executor(self.process_workers, self.pdf_processor_name, self.processor_options, self.profiler)
+        return self._executor
+
+    def _process_pdf(self, pdf_path, output_folder, original_url, pdf_source=None, keep_pages=False) -> Tuple[bool, List[str]]:
+        """Whether text was extracted, and with keep_pages the Markdown of each page for the search index."""
         print(f"📄 Processing PDF: {os.path.basename(pdf_path)}")
+        page_texts = [] if keep_pages else None
         try:
-            fitz_processor = FitzProcessor()
-            markdown_output = fitz_processor.process(pdf_path)
-            if markdown_output:
-                markdown_output = f"[Original file]({original_url})\n\n---\n" + markdown_output
-                self._save_markdown(markdown_output, pdf_path, output_folder)
-            else:
+            with self._profile():
+                page_chunks = self.pdf_processor.process_pages(pdf_path, pdf_source)
+                has_content = self._save_markdown(page_chunks, pdf_path, output_folder, original_url, page_texts)
+            if not has_content:
                 print(f"No content extracted from {pdf_path}.")
-                return False
+                return False, None
         except Exception as e:
-            print(f"Error processing {pdf_path} with markdownify: {e}")
-            return False
-        return True
+            print(f"Error processing {pdf_path} with {self.pdf_processor_name}: {e}")
+            return False, None
+        return True, page_texts
+
 
+    def _profile(self):
+        """Profiles the enclosed processing when a profiler is configured."""
+        if not self.profiler:
+            return nullcontext()
+        if self._pdf_profiler is None:
+            self._pdf_profiler = PdfProfiler(self.profiler)
+        return self._pdf_profiler.profile()
 
-    def _save_markdown(self, markdown_content, pdf_path, output_folder):
-        """Saves the Markdown content to a file"""        
+    def _save_markdown(self, page_chunks, pdf_path, output_folder, original_url, page_texts: List[str] = None) -> bool:
+        """Streams the Markdown chunks to a file, returning False without writing it if there was no content.
+        The file is written under a temporary name and renamed when complete so a failure never leaves a partial file.
+        Each chunk is a page, and is also appended to page_texts when it is given."""
         output_md_path = os.path.join(
             output_folder, f"{os.path.splitext(os.path.basename(pdf_path))[0]}.md"
         )
-        with open(output_md_path, "w", encoding="utf-8") as md_file:
-            md_file.write(markdown_content)
\ No newline at end of file
+        temp_md_path = f"{output_md_path}.{os.getpid()}.tmp"
+        has_content = False
+        try:
+            with open(temp_md_path, "w", encoding="utf-8") as md_file:
+                md_file.write(f"[Original file]({original_url})\n\n---\n")
+                for chunk in page_chunks:
+                    has_content = has_content or bool(chunk)
+                    md_file.write(chunk)
+                    if page_texts is not None:
+                        page_texts.append(chunk)
+            if has_content:
+                os.replace(temp_md_path, output_md_path)
+        finally:
+            if os.path.exists(temp_md_path):
+                os.remove(temp_md_path)
+        return has_content
+
+
+_worker_meeting_processor = None
+
+
+def _create_executor(process_workers: int, pdf_processor: str, processor_options: dict, profiler: str = None) -> ProcessPoolExecutor:
+    logger = FileLoggerSingleton._instance
+    return ProcessPoolExecutor(
+        max_workers=process_workers,
+        # Forking while download threads hold locks, such as the logger's or stdout's, leaves them locked in the worker
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(logger.run_id if logger else None, logger.logs_folder if logger else None, pdf_processor, processor_options, profiler),
+    )
+
+
+def _init_worker(run_id, logs_folder, pdf_processor: str, processor_options: dict, profiler: str = None):
+    global _worker_meeting_processor
+    # Build the worker's own logger rather than trusting any instance carried over from the parent
+    FileLoggerSingleton._instance = None
+    if run_id is not None:
+        FileLoggerSingleton(run_id, logs_folder)
+    _worker_meeting_processor = MeetingProcessor(pdf_processor=pdf_processor, processor_options=processor_options, profiler=profiler)
+
+
+def _process_pdf_in_worker(pdf_path, output_folder, original_url, pdf_source=None, keep_pages=False) -> Tuple[bool, List[str]]:
+    return _worker_meeting_processor._process_pdf(pdf_path, output_folder, original_url, pdf_source, keep_pages)
\ No newline at end of file
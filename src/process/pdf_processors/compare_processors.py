@@ -0,0 +1,66 @@
+import argparse
+import glob
+import os
+import re
+import time
+from difflib import SequenceMatcher
+from typing import List
+
+from src.process.pdf_processors.registry import PDF_PROCESSOR_NAMES, create_pdf_processor
+
+MARKDOWN_SYNTAX = re.compile(r"[*_#>`\\]|^\s*-\s", re.MULTILINE)
+
+
+def compare_processors(pdf_paths: List[str], processor_names: List[str], repeat: int = 1):
+    """Runs each processor over the PDFs, reporting time taken and how closely the text matches the first processor."""
+    processors = {name: create_pdf_processor(name) for name in processor_names}
+    baseline_name = processor_names[0]
+    totals = {name: 0.0 for name in processor_names}
+    similarities = {name: [] for name in processor_names[1:]}
+
+    print(f"{'PDF':50} " + " ".join(f"{name + ' s':>14}" for name in processor_names) + " " + " ".join(f"{name + ' match':>18}" for name in processor_names[1:]))
+    for pdf_path in pdf_paths:
+        outputs = {}
+        timings = {}
+        for name, processor in processors.items():
+            start_time = time.perf_counter()
+            for _ in range(repeat):
+                outputs[name] = processor.process(pdf_path)
+            timings[name] = (time.perf_counter() - start_time) / repeat
+            totals[name] += timings[name]
+
+        baseline_words = _words(outputs[baseline_name])
+        row_similarities = []
+        for name in processor_names[1:]:
+            similarity = SequenceMatcher(None, baseline_words, _words(outputs[name]), autojunk=False).ratio()
+            similarities[name].append(similarity)
+            row_similarities.append(similarity)
+
+        print(f"{os.path.basename(pdf_path)[:50]:50} " + " ".join(f"{timings[name]:14.3f}" for name in processor_names) + " " + " ".join(f"{similarity:18.1%}" for similarity in row_similarities))
+
+    print(f"{'Total':50} " + " ".join(f"{totals[name]:14.3f}" for name in processor_names) + " " + " ".join(f"{sum(values) / max(len(values), 1):18.1%}" for values in similarities.values()))
+    for name in processor_names[1:]:
+        if totals[name]:
+            print(f"{name} is {totals[baseline_name] / totals[name]:.2f}x the speed of {baseline_name}")
+
+
+def _words(markdown: str) -> List[str]:
+    """The words of the text with markdown syntax removed, so only the extracted text is compared."""
+    return MARKDOWN_SYNTAX.sub(" ", markdown).split()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the speed and output of PDF processors.")
+    parser.add_argument("paths", nargs="+", help="PDF files or folders to search for PDFs")
+    parser.add_argument("--processors", nargs="+", default=["fitz", "fitz-dict", "tiered"], choices=PDF_PROCESSOR_NAMES, help="Processors to compare, the first is the baseline")
+    parser.add_argument("--repeat", type=int, default=1, help="Times to process each PDF, timings are averaged")
+    args = parser.parse_args()
+
+    pdf_paths = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(sorted(glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)))
+        else:
+            pdf_paths.append(path)
+
+    compare_processors(pdf_paths, args.processors, args.repeat)
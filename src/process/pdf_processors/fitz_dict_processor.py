@@ -0,0 +1,112 @@
+import re
+from collections import Counter
+import fitz  # PyMuPDF
+from src.process.pdf_processors.fitz_processor import FitzProcessor
+
+# Structured text without image data, images are located separately with get_image_info
+TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+BULLET_CHARACTERS = "•●▪■◦○‣∙·-–"
+NUMBERED_ITEM = re.compile(r"^(\d+[.)]|\([a-zA-Z0-9]+\))\s")
+MARKDOWN_SPECIAL_CHARACTERS = re.compile(r"([*_\\])")
+SURROUNDING_WHITESPACE = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+BOLD_BOUNDARY = re.compile(r"\*\*(\s*)\*\*")
+MAX_HEADING_LENGTH = 150
+
+
+class FitzDictProcessor(FitzProcessor, name="fitz-dict"):
+    """Builds Markdown straight from PyMuPDF's structured text output in a single pass per page.
+
+    Headings are inferred from font size relative to the page's body text, or from short all-bold blocks.
+    Bulleted lines become list items and images are replaced with a placeholder in reading position.
+    Scanned pages are OCR'd the same way as FitzProcessor.
+    """
+    version = "1"
+
+    def _page_to_markdown(self, page: fitz.Page):
+        return self._textpage_to_markdown(page, page.get_textpage(flags=TEXT_FLAGS))
+
+    def _textpage_to_markdown(self, page: fitz.Page, textpage: fitz.TextPage):
+        """Converts a page's structured text, extracted with TEXT_FLAGS, to Markdown, or returns None if it has no text."""
+        blocks = [block for block in textpage.extractDICT()["blocks"] if block["type"] == 0]
+        lines = [line for block in blocks for line in block["lines"]]
+        if not any(span["text"].strip() for line in lines for span in line["spans"]):
+            return None
+
+        body_size = _body_font_size(lines)
+        # Resources are checked first as locating images means another pass over the page's content
+        images = sorted(image["bbox"][1] for image in page.get_image_info()) if page.get_images() else []
+        image_index = 0
+
+        markdown_blocks = []
+        for block in blocks:
+            # Images above this block come first, keeping their place in the reading order
+            while image_index < len(images) and images[image_index] < block["bbox"][1]:
+                markdown_blocks.append("(Image omitted)")
+                image_index += 1
+            block_markdown = _block_to_markdown(block, body_size)
+            if block_markdown:
+                markdown_blocks.append(block_markdown)
+        markdown_blocks.extend("(Image omitted)" for _ in images[image_index:])
+
+        return "\n\n".join(markdown_blocks) + "\n"
+
+
+def _body_font_size(lines) -> float:
+    """The font size covering the most characters on the page."""
+    sizes = Counter()
+    for line in lines:
+        for span in line["spans"]:
+            sizes[round(span["size"], 1)] += len(span["text"].strip())
+    return sizes.most_common(1)[0][0] if sizes else 0
+
+
+def _block_to_markdown(block, body_size: float) -> str:
+    spans = [span for line in block["lines"] for span in line["spans"] if span["text"].strip()]
+    if not spans:
+        return ""
+
+    block_text = " ".join("".join(span["text"] for span in line["spans"]) for line in block["lines"])
+    block_text = MARKDOWN_SPECIAL_CHARACTERS.sub(r"\\\1", " ".join(block_text.split()))
+    if len(block_text) <= MAX_HEADING_LENGTH:
+        largest_size = max(span["size"] for span in spans)
+        if body_size and largest_size >= body_size * 1.6:
+            return f"# {block_text}"
+        if body_size and largest_size >= body_size * 1.25:
+            return f"## {block_text}"
+        if all(_is_bold(span) for span in spans) and len(block["lines"]) == 1:
+            return f"### {block_text}"
+
+    lines_markdown = []
+    for line in block["lines"]:
+        line_markdown = _line_to_markdown(line)
+        if not line_markdown:
+            continue
+        if line_markdown[0] in BULLET_CHARACTERS and line_markdown[1:2] in (" ", ""):
+            lines_markdown.append(f"- {line_markdown[1:].strip()}")
+        elif NUMBERED_ITEM.match(line_markdown) or not lines_markdown:
+            lines_markdown.append(line_markdown)
+        else:
+            # Wrapped lines continue the paragraph or list item above
+            lines_markdown[-1] = f"{lines_markdown[-1]} {line_markdown}"
+    return "\n".join(lines_markdown)
+
+
+def _line_to_markdown(line) -> str:
+    parts = []
+    for span in line["spans"]:
+        leading, text, trailing = SURROUNDING_WHITESPACE.match(span["text"]).groups()
+        if not text:
+            parts.append(leading)
+            continue
+        text = MARKDOWN_SPECIAL_CHARACTERS.sub(r"\\\1", text)
+        if _is_bold(span):
+            text = f"**{text}**"
+        elif span["flags"] & fitz.TEXT_FONT_ITALIC:
+            text = f"*{text}*"
+        parts.append(f"{leading}{text}{trailing}")
+    # Neighbouring spans with the same emphasis are merged so markers do not stack up
+    return BOLD_BOUNDARY.sub(r"\1", "".join(parts)).strip()
+
+
+def _is_bold(span) -> bool:
+    return bool(span["flags"] & fitz.TEXT_FONT_BOLD) or "bold" in span["font"].lower()
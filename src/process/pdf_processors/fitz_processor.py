@@ -1,36 +1,98 @@
 import re
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Union
 from markdownify import markdownify as markdownify
-from PIL import Image
-import pytesseract
 import fitz  # PyMuPDF
+from src.logging.file_logger import log_message, log_metric
+from src.process.pdf_processors.ocr_engine import OcrEngine
 from src.process.pdf_processors.pdf_processor_base import PdfProcessorBase 
 
+OCR_PAGE_NOTICE = "*<small>Scanned page, text may contain errors. See original file for clarity</small>*  \n\n"
+
 # TODO: Split text processing, OCR processing, and Markdown conversion into separate classes
-class FitzProcessor(PdfProcessorBase):
-    def process(self, pdf_path: str):
-        """Extracts text from a PDF using PyMuPDF and converts it to Markdown with markdownify.
+class FitzProcessor(PdfProcessorBase, name="fitz"):
+    def __init__(self, ocr_dpi: int = 300, ocr_workers: int = 1, ocr_cache_folder: str = None):
+        self.ocr_engine = OcrEngine(dpi=ocr_dpi, workers=ocr_workers, cache_folder=ocr_cache_folder)
+
+    def config_id(self) -> str:
+        return f"{super().config_id()}:ocr-{self.ocr_engine.options_id()}"
+
+    def process_pages(self, pdf_path: str, pdf_source: Union[bytes, str] = None):
+        """Extracts text from a PDF using PyMuPDF and converts it to Markdown with markdownify, yielding a page at a time.
         Includes OCR for scanned PDFs."""
-        doc = fitz.open(pdf_path)
-        markdown_output = ""
-        ocr_used = False
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            if not page.get_text().strip():  # If no text is found, use OCR
-                if not ocr_used: # Only log OCR usage once per PDF
-                    self.log_ocr_usage(pdf_path)
-                    ocr_used = True
-                pix = page.get_pixmap()  # Render page as an image
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                img = img.resize((pix.width * 3, pix.height * 3), Image.Resampling.LANCZOS)
-                ocr_text = pytesseract.image_to_string(img)
-                markdown_output += f"*<small>Scanned page, text may contain errors. See original file for clarity</small>*  \n\n{ocr_text}\n"
-            else:
-                html_text = page.get_text("html")
+        start_time = time.perf_counter()
+        text_seconds = 0.0
+        ocr_pages = 0
+        ocr_cached_pages = 0
+        peak_pixmap_bytes = 0
+        # Pages wait here until every page before them is ready, OCR'd pages are held as futures
+        pending_pages = deque()
+        with _open_document(pdf_path, pdf_source) as doc:
+            for page_num in range(len(doc)):
+                page = doc[page_num]
+                
+                page_start_time = time.perf_counter()
+                page_markdown = self._page_to_markdown(page)
+                text_seconds += time.perf_counter() - page_start_time
+                if page_markdown is None:  # If no text is found, use OCR
+                    if not ocr_pages: # Only log OCR usage once per PDF
+                        self.log_ocr_usage(pdf_path)
+                    ocr_text, pixmap_bytes, from_cache = self.ocr_engine.submit(page)
+                    ocr_pages += 1
+                    ocr_cached_pages += from_cache
+                    peak_pixmap_bytes = max(peak_pixmap_bytes, pixmap_bytes)
+                    pending_pages.append(ocr_text)
+                else:
+                    pending_pages.append(page_markdown)
+                self._page_done(pdf_path, page_num, pending_pages[-1], page_start_time)
                 
-                # Replace <img> tags with a placeholder
-                html_text = re.sub(r'<img[^>]*>', '(Image omitted)', html_text)
-                markdown_output += markdownify(html_text)
-            markdown_output += "\n---\n"
-        # Post-process the Markdown to remove redundant `****`
-        return markdown_output
\ No newline at end of file
+                while pending_pages and (isinstance(pending_pages[0], str) or pending_pages[0].done()):
+                    yield self._page_output(pending_pages.popleft())
+            
+            while pending_pages:
+                yield self._page_output(pending_pages.popleft())
+            page_count = len(doc)
+        
+        # Includes time the caller spends between pages, which is writing each page out
+        log_metric(
+            "pdf",
+            file=pdf_path,
+            pages=page_count,
+            ocr_pages=ocr_pages,
+            ocr_cached_pages=ocr_cached_pages,
+            seconds=round(time.perf_counter() - start_time, 4),
+            text_seconds=round(text_seconds, 4),
+        )
+        if ocr_pages:
+            log_message(
+                "ocr_stats",
+                f"{pdf_path}, pages: {ocr_pages}, cached: {ocr_cached_pages}, peak page image bytes: {peak_pixmap_bytes}",
+            )
+
+    def _page_done(self, pdf_path: str, page_num: int, page_output, start_time: float):
+        """Called with each page's Markdown, or a future for its OCR text, once it is converted or submitted for OCR."""
+        pass
+
+    def _page_output(self, page_output) -> str:
+        if isinstance(page_output, Future):
+            return f"{OCR_PAGE_NOTICE}{page_output.result()}\n\n---\n"
+        return f"{page_output}\n---\n"
+
+    def _page_to_markdown(self, page: fitz.Page):
+        """Converts a page's text layer to Markdown, or returns None if it has no text and needs OCR."""
+        if not page.get_text().strip():
+            return None
+        html_text = page.get_text("html")
+        
+        # Replace <img> tags with a placeholder
+        html_text = re.sub(r'<img[^>]*>', '(Image omitted)', html_text)
+        return markdownify(html_text)
+
+
+def _open_document(pdf_path: str, pdf_source: Union[bytes, str] = None) -> fitz.Document:
+    if isinstance(pdf_source, (bytes, bytearray)):
+        # Opened from memory, the PDF is never written to disk
+        return fitz.open(stream=pdf_source, filetype="pdf")
+    return fitz.open(pdf_source or pdf_path)
@@ -0,0 +1,128 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import fitz  # PyMuPDF
+import pytesseract
+from PIL import Image
+
+from src.logging.file_logger import log_metric
+from src.utils.storage import write_atomic
+
+DEFAULT_OCR_LANGUAGE = "eng"
+
+
+class OcrEngine:
+    """Renders pages to grayscale images at a target DPI and runs tesseract on them.
+
+    Pages are OCR'd on a thread pool while the caller renders the next page. Only a couple of rendered
+    pages per worker are held at once to bound memory. Results are cached by a hash of the rendered image,
+    the tesseract version, language and config, so a page that has been OCR'd before the same way, in this
+    PDF or any other, is never OCR'd again.
+    """
+    def __init__(self, dpi: int = 300, workers: int = 1, cache_folder: str = None, language: str = DEFAULT_OCR_LANGUAGE, config: str = ""):
+        self.dpi = dpi
+        self.workers = max(1, workers)
+        self.cache_folder = cache_folder
+        self.language = language
+        self.config = config
+        self._cache_key_prefix = None
+        self._executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        if self._executor:
+            # Tesseract's own threads would compete with ours
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        if cache_folder:
+            os.makedirs(cache_folder, exist_ok=True)
+
+    def submit(self, page: fitz.Page):
+        """Starts OCR of a page.
+
+        Returns:
+            (Future, int, bool): A future for the page text, the size in bytes of the rendered page,
+            and whether the text came from the cache.
+        """
+        self._slots.acquire()
+        try:
+            pix = page.get_pixmap(dpi=self.dpi, colorspace=fitz.csGRAY, alpha=False)
+            pixmap_bytes = pix.stride * pix.height
+            cache_key = self._cache_key(pix)
+            cached_text = self._read_cache(cache_key)
+        except Exception:
+            self._slots.release()
+            raise
+
+        if cached_text is not None:
+            self._slots.release()
+            future = Future()
+            future.set_result(cached_text)
+            return future, pixmap_bytes, True
+
+        if self._executor:
+            with self._lock:
+                # A duplicate of a page still being OCR'd shares its result
+                future = self._in_flight.get(cache_key)
+                if future is not None:
+                    self._slots.release()
+                    return future, pixmap_bytes, True
+                future = self._executor.submit(self._ocr, pix, cache_key)
+                self._in_flight[cache_key] = future
+            future.add_done_callback(lambda _: self._ocr_done(cache_key))
+        else:
+            future = Future()
+            try:
+                future.set_result(self._ocr(pix, cache_key))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._slots.release()
+        return future, pixmap_bytes, False
+
+    def options_id(self) -> str:
+        """The settings that change the OCR text of a page."""
+        return f"dpi={self.dpi},lang={self.language},config={self.config}"
+
+    def _cache_key(self, pix: fitz.Pixmap) -> str:
+        if self._cache_key_prefix is None:
+            # Asks the tesseract binary, so it is only done once a page needs OCR
+            self._cache_key_prefix = f"tesseract={pytesseract.get_tesseract_version()},{self.options_id()}\n".encode("utf-8")
+        sha256 = hashlib.sha256(self._cache_key_prefix)
+        sha256.update(pix.samples_mv)
+        return sha256.hexdigest()
+
+    def _ocr_done(self, cache_key: str):
+        with self._lock:
+            self._in_flight.pop(cache_key, None)
+        self._slots.release()
+
+    def _ocr(self, pix: fitz.Pixmap, cache_key: str) -> str:
+        # Wraps the pixmap's buffer rather than copying it
+        img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+        start_time = time.perf_counter()
+        text = pytesseract.image_to_string(img, lang=self.language, config=self.config)
+        log_metric("ocr_page", seconds=round(time.perf_counter() - start_time, 4), pixels=pix.width * pix.height)
+        self._write_cache(cache_key, text)
+        return text
+
+    def _cache_path(self, cache_key: str) -> str:
+        return os.path.join(self.cache_folder, cache_key[:2], f"{cache_key}.txt")
+
+    def _read_cache(self, cache_key: str):
+        if not self.cache_folder:
+            return None
+        cache_path = self._cache_path(cache_key)
+        if not os.path.exists(cache_path):
+            return None
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            return cache_file.read()
+
+    def _write_cache(self, cache_key: str, text: str):
+        if not self.cache_folder:
+            return
+        cache_path = self._cache_path(cache_key)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        write_atomic(cache_path, text)
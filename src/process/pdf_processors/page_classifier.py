@@ -0,0 +1,73 @@
+import re
+
+import fitz  # PyMuPDF
+from src.process.pdf_processors.fitz_dict_processor import BULLET_CHARACTERS, MAX_HEADING_LENGTH, NUMBERED_ITEM
+from src.types.page_classification import PageClassification
+
+# From cheapest to most expensive
+PAGE_TIERS = ("blank", "text", "layout", "ocr")
+# A page with less text than this and mostly covered by images is a scan, perhaps with a stamped page number
+SCANNED_MAX_TEXT_CHARS = 50
+SCANNED_MIN_IMAGE_COVERAGE = 0.6
+# Pages with more blocks than this are tables or forms, where inferring headings and lists only adds noise
+MAX_LAYOUT_BLOCKS = 150
+# Blocks within this fraction of the page height from its top or bottom are running headers and footers,
+# which would otherwise look like headings on nearly every page
+MARGIN_FRACTION = 0.06
+PAGE_NUMBER = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+
+
+def classify_page(page: fitz.Page, textpage: fitz.TextPage) -> PageClassification:
+    """
+    Chooses the cheapest tier that can convert a page, from its text blocks and the area its images cover.
+
+    blank pages have nothing to extract, text pages are prose with no headings, lists or images so plain
+    text is enough, layout pages need their structure inferred, and ocr pages are scans or vector-only
+    pages such as text converted to outlines.
+    """
+    blocks = [block for block in textpage.extractBLOCKS() if block[4].strip()]
+    text_chars = sum(len(block[4].strip()) for block in blocks)
+    # Resources are checked first as locating images means another pass over the page's content
+    image_coverage = _image_coverage(page) if page.get_images() else 0.0
+    has_drawings = not text_chars and not image_coverage and bool(page.get_cdrawings())
+
+    if not text_chars:
+        tier = "ocr" if image_coverage or has_drawings else "blank"
+    elif text_chars <= SCANNED_MAX_TEXT_CHARS and image_coverage >= SCANNED_MIN_IMAGE_COVERAGE:
+        tier = "ocr"
+    elif not image_coverage and (len(blocks) > MAX_LAYOUT_BLOCKS or not any(_has_structure(block[4]) for block in blocks if not _is_page_furniture(block, page.rect))):
+        tier = "text"
+    else:
+        tier = "layout"
+    return {
+        "tier": tier,
+        "text_chars": text_chars,
+        "text_blocks": len(blocks),
+        "image_coverage": round(image_coverage, 3),
+        "has_drawings": has_drawings,
+    }
+
+
+def _image_coverage(page: fitz.Page) -> float:
+    """The fraction of the page covered by images, overlapping images are counted twice so it is capped at 1."""
+    page_area = page.rect.get_area()
+    if not page_area:
+        return 0.0
+    covered = sum((fitz.Rect(image["bbox"]) & page.rect).get_area() for image in page.get_image_info())
+    return min(1.0, covered / page_area)
+
+
+def _is_page_furniture(block, page_rect: fitz.Rect) -> bool:
+    """Whether a block is a running header or footer, or a page number, rather than part of the page's content."""
+    margin = page_rect.height * MARGIN_FRACTION
+    if block[3] <= page_rect.y0 + margin or block[1] >= page_rect.y1 - margin:
+        return True
+    return bool(PAGE_NUMBER.match(" ".join(block[4].split())))
+
+
+def _has_structure(block_text: str) -> bool:
+    """Whether a block could be a heading or holds list items, which the layout tier would format."""
+    lines = [line.strip() for line in block_text.strip().splitlines() if line.strip()]
+    if len(lines) == 1 and len(lines[0]) <= MAX_HEADING_LENGTH:
+        return True
+    return any((line[0] in BULLET_CHARACTERS and line[1:2] in (" ", "")) or NUMBERED_ITEM.match(line) for line in lines)
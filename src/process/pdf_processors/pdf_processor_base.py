@@ -1,10 +1,32 @@
 import os
 from datetime import datetime
 from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Type, Union
 
-from src.logging.file_logger import FileLoggerSingleton
+from src.logging.file_logger import log_message
 
 class PdfProcessorBase(ABC):
+    # Bump when a change to the processor alters its output, so existing markdown is regenerated
+    version = "1"
+    # Processors by the name they are chosen with, a subclass is added by defining it with a name
+    registry: Dict[str, Type["PdfProcessorBase"]] = {}
+    name: str = None
+
+    def __init_subclass__(cls, name: str = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if name:
+            cls.name = name
+            PdfProcessorBase.registry[name] = cls
+
+    def config_id(self) -> str:
+        """
+        Identifies this processor and any settings that affect its output.
+
+        Returns:
+            str: Recorded alongside each processed file to tell when it needs reprocessing.
+        """
+        return f"{type(self).__name__}:{self.version}"
+
     def log_ocr_usage(self, pdf_path: str):
         """
         Logs the usage of OCR for a given PDF file.
@@ -13,17 +35,31 @@ class PdfProcessorBase(ABC):
             pdf_path (str): The path to the PDF file for which OCR was used.
         """
         
-        FileLoggerSingleton._instance.log("ocr_used", f"{pdf_path}")
+        log_message("ocr_used", f"{pdf_path}")
 
-    @abstractmethod
-    def process(self, pdf_path: str):
+    def process(self, pdf_path: str, pdf_source: Union[bytes, str] = None) -> str:
         """
         Process the given PDF file.
 
         Args:
             pdf_path (str): The path to the PDF file to process.
+            pdf_source (bytes | str): The PDF's content, or the path of a copy of it, to read instead of pdf_path.
+
+        Returns:
+            str: The whole document as Markdown. Prefer process_pages for large documents.
+        """
+        return "".join(self.process_pages(pdf_path, pdf_source))
+
+    @abstractmethod
+    def process_pages(self, pdf_path: str, pdf_source: Union[bytes, str] = None) -> Iterator[str]:
+        """
+        Process the given PDF file a page at a time.
+
+        Args:
+            pdf_path (str): The path to the PDF file to process.
+            pdf_source (bytes | str): The PDF's content, or the path of a copy of it, to read instead of pdf_path.
 
         Returns:
-            None
+            Iterator[str]: One Markdown chunk per page in document order, so the document never has to be held in memory.
         """
         pass
\ No newline at end of file
@@ -0,0 +1,20 @@
+import importlib
+
+from src.process.pdf_processors.pdf_processor_base import PdfProcessorBase
+
+# Each processor registers itself on PdfProcessorBase when its module is imported, which is left
+# until it is used as PyMuPDF, tesseract and markdownify are slow to import
+PDF_PROCESSOR_MODULES = {
+    "fitz": "src.process.pdf_processors.fitz_processor",
+    "fitz-dict": "src.process.pdf_processors.fitz_dict_processor",
+    "tiered": "src.process.pdf_processors.tiered_processor",
+}
+PDF_PROCESSOR_NAMES = tuple(PDF_PROCESSOR_MODULES)
+
+
+def create_pdf_processor(name: str = "fitz", **options) -> PdfProcessorBase:
+    """Creates the PDF processor registered under name, passing options to its constructor."""
+    if name not in PDF_PROCESSOR_MODULES:
+        raise ValueError(f"Unknown PDF processor '{name}', expected one of: {', '.join(PDF_PROCESSOR_NAMES)}")
+    importlib.import_module(PDF_PROCESSOR_MODULES[name])
+    return PdfProcessorBase.registry[name](**options)
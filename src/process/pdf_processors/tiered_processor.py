@@ -0,0 +1,64 @@
+import time
+from concurrent.futures import Future
+
+import fitz  # PyMuPDF
+from src.logging.file_logger import log_metric
+from src.process.pdf_processors.fitz_dict_processor import MARKDOWN_SPECIAL_CHARACTERS, TEXT_FLAGS, FitzDictProcessor
+from src.process.pdf_processors.page_classifier import classify_page
+
+
+class TieredProcessor(FitzDictProcessor, name="tiered"):
+    """Classifies each page and converts it with the cheapest adequate tier.
+
+    Blank pages are skipped, prose pages are taken as plain text, pages with headings, lists or images
+    are converted as FitzDictProcessor does, and scanned or vector-only pages are OCR'd. The text
+    extraction is shared by the classifier and the tier. Each page's tier, the features it was chosen by
+    and the time taken, including OCR, are recorded in the page metric so the thresholds in
+    page_classifier can be tuned against real documents.
+    """
+    version = "1"
+
+    def __init__(self, ocr_dpi: int = 300, ocr_workers: int = 1, ocr_cache_folder: str = None):
+        super().__init__(ocr_dpi=ocr_dpi, ocr_workers=ocr_workers, ocr_cache_folder=ocr_cache_folder)
+        # The classification of the page being converted, pages are converted one at a time
+        self._page_classification = None
+
+    def _page_to_markdown(self, page: fitz.Page):
+        textpage = page.get_textpage(flags=TEXT_FLAGS)
+        self._page_classification = classify_page(page, textpage)
+        tier = self._page_classification["tier"]
+        if tier == "blank":
+            return ""
+        if tier == "ocr":
+            return None
+        if tier == "text":
+            return _textpage_to_plain_markdown(textpage)
+        return self._textpage_to_markdown(page, textpage)
+
+    def _page_done(self, pdf_path: str, page_num: int, page_output, start_time: float):
+        classification = self._page_classification
+        if isinstance(page_output, Future):
+            # OCR may still be running on another thread, so the page is recorded when it finishes
+            page_output.add_done_callback(lambda _: _log_page(pdf_path, page_num, classification, start_time))
+        else:
+            _log_page(pdf_path, page_num, classification, start_time)
+
+
+def _textpage_to_plain_markdown(textpage: fitz.TextPage) -> str:
+    """Each text block as a paragraph, with its wrapped lines joined."""
+    paragraphs = [" ".join(block[4].split()) for block in textpage.extractBLOCKS() if block[4].strip()]
+    return "\n\n".join(MARKDOWN_SPECIAL_CHARACTERS.sub(r"\\\1", paragraph) for paragraph in paragraphs) + "\n"
+
+
+def _log_page(pdf_path: str, page_num: int, classification, start_time: float):
+    log_metric(
+        "page",
+        file=pdf_path,
+        page=page_num + 1,
+        outcome=classification["tier"],
+        seconds=round(time.perf_counter() - start_time, 4),
+        text_chars=classification["text_chars"],
+        text_blocks=classification["text_blocks"],
+        image_coverage=classification["image_coverage"],
+        has_drawings=classification["has_drawings"],
+    )
@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows, where runs sharing a manifest are not supported
+    fcntl = None
+
+from src.utils.storage import write_atomic
+
+SAVE_INTERVAL_SECONDS = 60
+
+
+class ProcessingManifest:
+    """Records the inputs each output file was generated from so unchanged inputs can be skipped.
+
+    Entries are keyed by the output path relative to the manifest's folder, so the output tree can be moved.
+    Several processes can share a manifest, each save merges the entries this process set into the file.
+    """
+    def __init__(self, manifest_path: str):
+        self.manifest_path = manifest_path
+        self.root_folder = os.path.dirname(os.path.abspath(manifest_path))
+        self.entries = {}
+        self._changed = set()
+        self._lock = threading.Lock()
+        self._last_saved = time.monotonic()
+        self.entries = self._read()
+
+    def get(self, output_path: str):
+        return self.entries.get(self._key(output_path))
+
+    def set(self, output_path: str, entry: dict):
+        with self._lock:
+            key = self._key(output_path)
+            self.entries[key] = entry
+            self._changed.add(key)
+
+    def save(self):
+        os.makedirs(self.root_folder, exist_ok=True)
+        with self._lock, self._file_lock():
+            # Other processes may have saved their entries since this one read the file
+            entries = self._read()
+            entries.update((key, self.entries[key]) for key in self._changed)
+            write_atomic(self.manifest_path, json.dumps(entries, indent=1, sort_keys=True))
+            self.entries = entries
+            self._changed.clear()
+        self._last_saved = time.monotonic()
+
+    def save_if_due(self):
+        """Saves periodically during long runs so a crash loses little progress."""
+        if time.monotonic() - self._last_saved >= SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def _read(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as manifest_file:
+                return json.load(manifest_file)
+        except (OSError, ValueError) as e:
+            print(f"Could not read processing manifest {self.manifest_path}, all files will be processed: {e}")
+            return {}
+
+    @contextmanager
+    def _file_lock(self):
+        """Holds an exclusive lock on the manifest's lock file, so saves from other processes are not lost."""
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.manifest_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _key(self, output_path: str) -> str:
+        return os.path.relpath(os.path.abspath(output_path), self.root_folder).replace(os.sep, "/")
+
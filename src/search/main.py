@@ -0,0 +1,48 @@
+import argparse
+import os
+import time
+from datetime import datetime
+from typing import List
+
+from src.search.search_index import SearchIndex
+
+
+def search(query: str, search_index_location: str = "./data/search.sqlite", output_location: str = "./data/processed", limit: int = 10, start_year: int = None, end_year: int = None, meeting_filter: List[str] = None, raw_query: bool = False):
+    """Prints the pages of extracted text best matching the query."""
+    if not os.path.exists(search_index_location):
+        print(f"Search index {search_index_location} does not exist, process some meetings first.")
+        return
+
+    search_index = SearchIndex(search_index_location, output_location)
+    start_time = time.perf_counter()
+    results = search_index.search(
+        query,
+        limit=limit,
+        start_date=datetime(start_year, 1, 1) if start_year else None,
+        end_date=datetime(end_year + 1, 1, 1) if end_year else None,
+        meeting_filter=meeting_filter,
+        raw_query=raw_query,
+    )
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+    search_index.close()
+
+    for result in results:
+        print(f"📄 {result['datetime']} {result['meeting_name']} - {result['file_name']}, page {result['page']}")
+        print(f"   {os.path.join(output_location, result['document'])}")
+        print(f"   {' '.join(result['snippet'].split())}\n")
+    print(f"{len(results)} results in {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search the text extracted from council meeting PDFs.")
+    parser.add_argument("query", nargs="+", help="Words to search for, every word must appear on a page")
+    parser.add_argument("--search-index-location", type=str, default="./data/search.sqlite", help="Location of the full-text search index")
+    parser.add_argument("--output-location", type=str, default="./data/processed", help="Location of the processed markdown files")
+    parser.add_argument("--limit", type=int, default=10, help="Most results to show")
+    parser.add_argument("--start-year", type=int, default=None, help="Only search meetings from this year on")
+    parser.add_argument("--end-year", type=int, default=None, help="Only search meetings up to the end of this year")
+    parser.add_argument("--meeting-filter", nargs='+', type=str, default=None, help="Filter meetings by names (case insensitive, e.g., 'council budget')")
+    parser.add_argument("--raw-query", action="store_true", help="Pass the query to SQLite FTS5 as is, allowing phrases, prefixes, OR and NOT")
+    args = parser.parse_args()
+
+    search(" ".join(args.query), args.search_index_location, args.output_location, args.limit, args.start_year, args.end_year, args.meeting_filter, args.raw_query)
@@ -0,0 +1,120 @@
+import os
+import threading
+from datetime import datetime
+from typing import List
+
+from src.types.meeting_details import MeetingDetails
+from src.types.search_result import SearchResult
+from src.utils.database import connect, meeting_filter_clause
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    document TEXT NOT NULL UNIQUE,
+    source_id TEXT NOT NULL,
+    meeting_name TEXT NOT NULL,
+    meeting_datetime TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS documents_by_datetime ON documents (meeting_datetime);
+CREATE TABLE IF NOT EXISTS page_texts (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS page_texts_by_document ON page_texts (document_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS pages USING fts5(text, content='page_texts', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2');
+CREATE TRIGGER IF NOT EXISTS page_texts_inserted AFTER INSERT ON page_texts BEGIN
+    INSERT INTO pages (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS page_texts_deleted AFTER DELETE ON page_texts BEGIN
+    INSERT INTO pages (pages, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+class SearchIndex:
+    """A full-text index of the extracted markdown, one row per page, searched with SQLite FTS5.
+
+    Documents are keyed by their path relative to documents_folder. Each records the source it was
+    extracted from, so a document whose PDF and processor are unchanged is never read or indexed again.
+    """
+    def __init__(self, index_path: str, documents_folder: str):
+        self.index_path = index_path
+        self.documents_folder = os.path.abspath(documents_folder)
+        os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+        # Created by the main thread and used by the pipeline's thread, the lock serialises its use
+        self._connection = connect(index_path)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def is_current(self, md_path: str, source_id: str) -> bool:
+        """Whether md_path is indexed from the given source."""
+        with self._lock:
+            row = self._connection.execute("SELECT source_id FROM documents WHERE document = ?", (self._key(md_path),)).fetchone()
+        return row is not None and row[0] == source_id
+
+    def add_document(self, md_path: str, source_id: str, meeting: MeetingDetails, file_name: str, url: str, page_texts: List[str]):
+        """Indexes the Markdown of each page of the markdown file at md_path, replacing any earlier version of it.
+        The pages are passed as the processor produced them, the file's own rules cannot tell page breaks from rules in the text."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM documents WHERE document = ?", (self._key(md_path),))
+            document_id = self._connection.execute(
+                "INSERT INTO documents (document, source_id, meeting_name, meeting_datetime, file_name, url) VALUES (?, ?, ?, ?, ?, ?)",
+                (self._key(md_path), source_id, meeting["meeting_name"], str(meeting["datetime"]), file_name, url),
+            ).lastrowid
+            self._connection.executemany(
+                "INSERT INTO page_texts (document_id, page, text) VALUES (?, ?, ?)",
+                ((document_id, page, text) for page, text in enumerate(page_texts, start=1) if text.strip()),
+            )
+
+    def remove_document(self, md_path: str):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM documents WHERE document = ?", (self._key(md_path),))
+
+    def search(self, query: str, limit: int = 10, start_date: datetime = None, end_date: datetime = None, meeting_filter: List[str] = None, raw_query: bool = False) -> List[SearchResult]:
+        """The best matching pages, most relevant first.
+
+        Each word of the query must appear on the page. With raw_query the query is passed to FTS5 as is,
+        allowing its phrase, prefix and boolean syntax.
+        """
+        sql = """SELECT documents.document, meeting_name, meeting_datetime, file_name, url, page_texts.page,
+                snippet(pages, 0, '**', '**', '…', 16)
+            FROM pages
+            JOIN page_texts ON page_texts.id = pages.rowid
+            JOIN documents ON documents.id = page_texts.document_id
+            WHERE pages MATCH ?"""
+        parameters = [query if raw_query else _match_all_words(query)]
+        if start_date:
+            sql += " AND meeting_datetime >= ?"
+            parameters.append(str(start_date))
+        if end_date:
+            sql += " AND meeting_datetime < ?"
+            parameters.append(str(end_date))
+        if meeting_filter:
+            filter_clause, filter_parameters = meeting_filter_clause(meeting_filter)
+            sql += f" AND {filter_clause}"
+            parameters.extend(filter_parameters)
+        sql += " ORDER BY bm25(pages) LIMIT ?"
+        parameters.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, parameters).fetchall()
+        return [
+            {"document": document, "meeting_name": meeting_name, "datetime": meeting_datetime, "file_name": file_name, "url": url, "page": page, "snippet": snippet}
+            for document, meeting_name, meeting_datetime, file_name, url, page, snippet in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _key(self, md_path: str) -> str:
+        return os.path.relpath(os.path.abspath(md_path), self.documents_folder).replace(os.sep, "/")
+
+
+def _match_all_words(query: str) -> str:
+    """Quotes each word so characters such as / and - in reference numbers are not read as FTS5 syntax."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
@@ -1,7 +1,8 @@
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 class FileDetails(TypedDict):
     display_text: str
     file_name: str
     url: str
-    downloaded: bool
\ No newline at end of file
+    downloaded: bool
+    sha256: NotRequired[str]
\ No newline at end of file
@@ -0,0 +1,8 @@
+from typing import TypedDict
+
+class PageClassification(TypedDict):
+    tier: str
+    text_chars: int
+    text_blocks: int
+    image_coverage: float
+    has_drawings: bool
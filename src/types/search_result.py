@@ -0,0 +1,10 @@
+from typing import TypedDict
+
+class SearchResult(TypedDict):
+    document: str
+    meeting_name: str
+    datetime: str
+    file_name: str
+    url: str
+    page: int
+    snippet: str
@@ -0,0 +1,19 @@
+import sqlite3
+from typing import List, Tuple
+
+# Workers sharing a work queue write to the same files, so their transactions are waited for rather than failed
+BUSY_TIMEOUT_SECONDS = 60
+
+
+def connect(database_path: str, **kwargs) -> sqlite3.Connection:
+    """Opens an SQLite file that is used from several threads, each use serialised by the caller's lock,
+    with foreign keys enforced."""
+    connection = sqlite3.connect(database_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, **kwargs)
+    connection.execute("PRAGMA foreign_keys = ON")
+    return connection
+
+
+def meeting_filter_clause(meeting_filter: List[str]) -> Tuple[str, List[str]]:
+    """An SQL condition matching rows whose meeting_name contains any of the words, case insensitive, and its parameters."""
+    clause = "(" + " OR ".join("instr(lower(meeting_name), ?) > 0" for _ in meeting_filter) + ")"
+    return clause, [filter_word.lower() for filter_word in meeting_filter]
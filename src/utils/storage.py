@@ -0,0 +1,40 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def write_atomic(path: Union[str, Path], content: str):
+    """Writes content under a temporary name and renames it into place, so readers never see a partial file.
+    The temporary name is unique to the process and thread, so concurrent writers do not clobber each other's."""
+    temp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as temp_file:
+            temp_file.write(content)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def hash_file(path: Union[str, Path], sha256=None, chunk_size: int = HASH_CHUNK_SIZE):
+    """Feeds the file's bytes to sha256, a new SHA-256 hash unless one is given, and returns it.
+    Read in chunks so large files are never held in memory."""
+    sha256 = sha256 if sha256 is not None else hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            sha256.update(chunk)
+    return sha256
+
+
+def conditional_headers(entry) -> dict:
+    """Headers asking the server to answer 304 Not Modified if the stored copy described by entry is current."""
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
@@ -0,0 +1,106 @@
+import argparse
+import os
+from datetime import datetime
+from typing import List
+
+import urllib3
+
+# Record the script start time
+script_start_time = datetime.now()
+from src.catalog.meeting_catalog import CATALOG_FILE_NAME, MeetingCatalog
+from src.download.html_scraper import HTML_SCRAPERS, set_html_scraper
+from src.download.http_session import HttpSessionSingleton
+from src.download.meeting_files_downloader import MeetingFilesDownloader
+from src.download.response_cache import ResponseCacheSingleton
+from src.logging.file_logger import FileLoggerSingleton
+from src.process.main import create_meeting_processor
+from src.process.pdf_processors.registry import PDF_PROCESSOR_NAMES
+from src.watch.meeting_watcher import MeetingWatcher
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def watch_meetings(interval_seconds: float = 300, once: bool = False, meeting_filter: List[str] = None, file_filter: List[str] = None, download_location: str = "./data/downloaded", output_location: str = "./data/processed", download_workers: int = 4, download_host_limit: int = 4, request_timeout: float = 60, request_retries: int = 4, cache_location: str = "./data/cache", html_scraper: str = "auto", process_workers: int = 1, ocr_dpi: int = 300, ocr_workers: int = 1, pdf_processor: str = "fitz", search_index_location: str = None, index_pages: bool = False):
+    """Publishes meetings of the previous and current months as they appear, polling every interval_seconds.
+    With once, polls a single time and returns."""
+    set_html_scraper(html_scraper)
+    if cache_location:
+        # Pages are revalidated at every poll, but not again when the downloader fetches a meeting page just checked
+        ResponseCacheSingleton(os.path.join(cache_location, "http"), ttl_seconds=max(1, int(interval_seconds // 2)))
+    HttpSessionSingleton(pool_size=max(2 * download_workers, download_host_limit), per_host_limit=download_host_limit, timeout=(min(10, request_timeout), request_timeout), retries=request_retries)
+    catalog = MeetingCatalog(os.path.join(os.path.abspath(download_location), CATALOG_FILE_NAME))
+    meeting_processor = create_meeting_processor(output_location, process_workers, False, ocr_dpi, ocr_workers, os.path.join(cache_location, "ocr") if cache_location else None, pdf_processor, search_index_location)
+    watcher = MeetingWatcher(
+        downloader=MeetingFilesDownloader(download_location, download_workers, catalog=catalog),
+        meeting_processor=meeting_processor,
+        catalog=catalog,
+        output_location=output_location,
+        meeting_filter=meeting_filter,
+        file_filter=file_filter,
+        page_workers=download_workers,
+        index_pages=index_pages,
+    )
+    try:
+        if once:
+            watcher.poll()
+        else:
+            watcher.run(interval_seconds)
+    except KeyboardInterrupt:
+        print("👋 Stopped watching")
+    finally:
+        meeting_processor.close()
+        catalog.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stay running and publish markdown for new council meetings as soon as they appear.")
+    parser.add_argument("--interval-seconds", type=float, default=300, help="Seconds between polls of the previous and current months")
+    parser.add_argument("--once", action="store_true", help="Poll once and exit")
+    parser.add_argument("--meeting-filter", nargs='+', type=str, default=None, help="Filter meetings by names (case insensitive, e.g., 'council budget')")
+    parser.add_argument("--file-filter", nargs='*', type=str, default=["agenda", "minutes"], help="Filter files by names (case insensitive, e.g., 'agenda minutes'). Use '--file-filter' with no arguments to disable filtering.")
+    parser.add_argument("--download-location", type=str, default="./data/downloaded", help="Location to save downloaded files")
+    parser.add_argument("--output-location", type=str, default="./data/processed", help="Location to save processed files")
+    parser.add_argument("--logs-location", type=str, default="./.logs", help="Location to output logs")
+    parser.add_argument("--cache-location", type=str, default="./data/cache", help="Location to cache fetched web pages and OCR results")
+    parser.add_argument("--no-cache", action="store_true", help="Always fetch web pages instead of using the cache")
+    parser.add_argument("--download-workers", type=int, default=4, help="Number of files to download, and meeting pages to check, concurrently")
+    parser.add_argument("--download-host-limit", type=int, default=4, help="Maximum concurrent requests to a single host, fewer are sent while the host is slow or throttling")
+    parser.add_argument("--request-timeout", type=float, default=60, help="Seconds to wait for a server to respond before retrying")
+    parser.add_argument("--request-retries", type=int, default=4, help="Times to retry a request that times out, fails to connect or gets a 429/5xx response")
+    parser.add_argument("--html-scraper", type=str, default="auto", choices=["auto", *HTML_SCRAPERS], help="Parser used to scrape web pages, auto uses the fastest installed")
+    parser.add_argument("--process-workers", type=int, default=1, help="Number of processes converting PDFs, kept running between polls")
+    parser.add_argument("--ocr-dpi", type=int, default=300, help="DPI used to render pages for OCR")
+    parser.add_argument("--ocr-workers", type=int, default=1, help="Number of threads running OCR per process")
+    parser.add_argument("--pdf-processor", type=str, default="fitz", choices=PDF_PROCESSOR_NAMES, help="PDF processor used to convert PDFs to markdown")
+    parser.add_argument("--search-index-location", type=str, default="./data/search.sqlite", help="Location of the full-text search index of extracted text")
+    parser.add_argument("--no-search-index", action="store_true", help="Do not add extracted text to the search index")
+    parser.add_argument("--index-pages", action="store_true", help="Write a README.md index for the watched years after each poll that publishes meetings")
+    args = parser.parse_args()
+
+    if not args.file_filter:  # If file-filter is provided with no arguments
+        args.file_filter = None
+
+    FileLoggerSingleton(script_start_time.strftime('%Y-%m-%d_%H-%M-%S'), args.logs_location)
+    watch_meetings(
+        interval_seconds=args.interval_seconds,
+        once=args.once,
+        meeting_filter=args.meeting_filter,
+        file_filter=args.file_filter,
+        download_location=args.download_location,
+        output_location=args.output_location,
+        download_workers=args.download_workers,
+        download_host_limit=args.download_host_limit,
+        request_timeout=args.request_timeout,
+        request_retries=args.request_retries,
+        cache_location=None if args.no_cache else args.cache_location,
+        html_scraper=args.html_scraper,
+        process_workers=args.process_workers,
+        ocr_dpi=args.ocr_dpi,
+        ocr_workers=args.ocr_workers,
+        pdf_processor=args.pdf_processor,
+        search_index_location=None if args.no_search_index else args.search_index_location,
+        index_pages=args.index_pages,
+    )
+
+    if ResponseCacheSingleton._instance:
+        ResponseCacheSingleton._instance.print_stats()
+    FileLoggerSingleton._instance.print_metrics_summary()
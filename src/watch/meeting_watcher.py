@@ -0,0 +1,110 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from src.catalog.meeting_catalog import MeetingCatalog
+from src.download.fetch_web_content import fetch_web_content
+from src.download.get_meetings_from_website import get_public_meetings_for_year_month
+from src.download.html_scraper import get_html_scraper
+from src.download.meeting_files_downloader import MeetingFilesDownloader, file_name_for_link, matches_file_filter
+from src.download.pdf_buffer import PdfBuffer
+from src.logging.file_logger import log_metric
+from src.process.index_pages import write_index_pages
+from src.process.meeting_processor import MeetingProcessor
+from src.types.meeting_details import MeetingDetails
+
+
+class MeetingWatcher:
+    """Polls the calendar of the previous and current months, downloading and processing meetings that
+    are new or have new files as soon as they are seen.
+
+    Everything is kept between polls: the HTTP connections, the catalog, and the meeting processor with
+    its PDF processor, OCR threads and worker processes. A meeting already in the catalog is only
+    downloaded again when its page links to a file the catalog does not have, or to one that failed
+    to download. Each meeting is processed as soon as its downloads finish.
+    """
+    def __init__(self, downloader: MeetingFilesDownloader, meeting_processor: MeetingProcessor, catalog: MeetingCatalog, output_location: str, meeting_filter: List[str] = None, file_filter: List[str] = None, page_workers: int = 4, index_pages: bool = False):
+        self.downloader = downloader
+        self.downloader.on_meeting_downloaded = self._publish
+        self.meeting_processor = meeting_processor
+        self.catalog = catalog
+        self.output_folder = os.path.abspath(output_location)
+        self.meeting_filter = meeting_filter
+        self.file_filter = file_filter
+        self.page_workers = max(1, page_workers)
+        self.index_pages = index_pages
+        self._detected_at = None
+
+    def run(self, interval_seconds: float):
+        """Polls every interval_seconds until interrupted."""
+        print(f"👀 Watching for new meetings every {interval_seconds:g}s")
+        while True:
+            poll_start_time = time.monotonic()
+            try:
+                self.poll()
+            except Exception as e:
+                # A failed poll, such as the website being down, is tried again at the next interval
+                print(f"\033[91m❌ Poll failed: {e}\033[0m")
+            time.sleep(max(0.0, interval_seconds - (time.monotonic() - poll_start_time)))
+
+    def poll(self) -> int:
+        """Checks the previous and current months once, returning how many meetings were downloaded and processed."""
+        start_time = time.perf_counter()
+        this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        last_month = (this_month - timedelta(days=1)).replace(day=1)
+        meetings = []
+        for month in (last_month, this_month):
+            meetings.extend(get_public_meetings_for_year_month(month.year, month.month, self.meeting_filter) or [])
+
+        with ThreadPoolExecutor(max_workers=self.page_workers) as executor:
+            changed = [meeting for meeting, has_changed in zip(meetings, executor.map(self._has_changed, meetings)) if has_changed]
+        if changed:
+            print(f"🆕 {len(changed)} new or updated meetings: {', '.join(meeting['meeting_name'] for meeting in changed)}")
+            self._detected_at = time.perf_counter()
+            self.downloader.download_meeting_files_from_website(changed, self.file_filter)
+            if self.meeting_processor.manifest:
+                self.meeting_processor.manifest.save()
+            if self.index_pages:
+                write_index_pages(self.catalog, self.output_folder, sorted({last_month.year, this_month.year}))
+        log_metric("watch_poll", meetings=len(meetings), changed=len(changed), seconds=round(time.perf_counter() - start_time, 4))
+        return len(changed)
+
+    def _has_changed(self, meeting: MeetingDetails) -> bool:
+        known_meeting = self.catalog.get_meeting(self.downloader.meeting_folder(meeting))
+        if known_meeting is None:
+            return True
+        # Revalidated with the website once the response cache's entry is older than half the interval
+        meeting_page_html = fetch_web_content(meeting['href'], meeting['datetime'])
+        if meeting_page_html is None:
+            return False
+        known_files = {file['url']: file for file in known_meeting['files']}
+        for link_text, link_href in get_html_scraper().pdf_links(meeting_page_html):
+            known_file = known_files.get(link_href)
+            if known_file is None:
+                return True
+            if not known_file['downloaded'] and matches_file_filter(file_name_for_link(link_text), self.file_filter):
+                return True
+        return False
+
+    def _publish(self, meeting: MeetingDetails, meeting_folder: Path, pdf_buffers: Dict[str, PdfBuffer]):
+        """Processes a meeting as soon as the downloader has saved it."""
+        output_folder = os.path.join(self.output_folder, os.path.relpath(os.path.abspath(meeting_folder), os.path.abspath(self.downloader.destination_folder)))
+        try:
+            self.meeting_processor.process_meetings(
+                [(str(meeting_folder), output_folder)],
+                self.file_filter,
+                {pdf_path: pdf_buffer.source() for pdf_path, pdf_buffer in pdf_buffers.items()},
+                {str(meeting_folder): meeting},
+            )
+        except Exception as e:
+            print(f"\033[91m❌ Failed to process meeting {meeting_folder}: {e}\033[0m")
+            return
+        finally:
+            for pdf_buffer in pdf_buffers.values():
+                pdf_buffer.close()
+        seconds = time.perf_counter() - self._detected_at
+        log_metric("publish", meeting=str(meeting_folder), seconds=round(seconds, 4))
+        print(f"📰 Published {meeting['meeting_name']} to {output_folder}, {seconds:.1f}s after it was seen")
@@ -0,0 +1,181 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from src.utils.database import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS units (
+    unit TEXT PRIMARY KEY,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    heartbeat_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS units_by_status ON units (status, unit);
+"""
+DEFAULT_LEASE_SECONDS = 300
+DEFAULT_MAX_ATTEMPTS = 3
+# Seconds between attempts when a heartbeat fails, such as while another worker holds the database lock
+HEARTBEAT_RETRY_SECONDS = 5
+
+
+class LeaseLost(Exception):
+    """Raised when a worker finds another worker may have taken over its unit."""
+
+
+class WorkQueue:
+    """A queue of calendar months to download and process, shared by workers through an SQLite file.
+
+    A worker claims a pending month, heartbeats while it works on it and marks it done, or releases it
+    if it fails. A month whose worker stops heartbeating for lease_seconds, because it crashed or its
+    machine went away, is claimed again by the next worker. Months are the unit of work as every meeting
+    folder belongs to one month, so two workers never write the same meeting folder.
+
+    Workers on other machines can share the queue on a volume with working file locks, which SQLite
+    needs, and clocks kept in step to well within the lease.
+    """
+    def __init__(self, queue_path: str, lease_seconds: float = DEFAULT_LEASE_SECONDS, max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        self.queue_path = queue_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        os.makedirs(os.path.dirname(os.path.abspath(queue_path)), exist_ok=True)
+        # Transactions are begun explicitly so a claim holds the write lock from its read to its update.
+        # Used by the worker and its heartbeat thread, the lock serialises its use
+        self._connection = connect(queue_path, isolation_level=None)
+        self._connection.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def add_months(self, start_date: datetime, end_date: datetime) -> int:
+        """Queues every month from start_date to end_date inclusive, returning how many were new.
+        Months already queued are left as they are, except failed months which are queued again."""
+        months = []
+        year, month = start_date.year, start_date.month
+        while (year, month) <= (end_date.year, end_date.month):
+            months.append((f"{year}-{month:02d}", year, month))
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        with self._transaction():
+            before = self._connection.execute("SELECT count(*) FROM units").fetchone()[0]
+            self._connection.executemany("INSERT OR IGNORE INTO units (unit, year, month) VALUES (?, ?, ?)", months)
+            added = self._connection.execute("SELECT count(*) FROM units").fetchone()[0] - before
+            self._connection.executemany(
+                "UPDATE units SET status = 'pending', attempts = 0, error = NULL WHERE unit = ? AND status = 'failed'",
+                ((unit,) for unit, _, _ in months),
+            )
+        return added
+
+    def claim(self, worker_id: str) -> Optional[Tuple[str, int, int]]:
+        """Claims the earliest pending month, or one whose worker's lease has expired.
+        Returns its (unit, year, month), or None when no month is left to claim."""
+        now = time.time()
+        with self._transaction():
+            # A month that keeps taking its workers down with it is given up on rather than claimed forever
+            self._connection.execute(
+                "UPDATE units SET status = 'failed', worker = NULL, error = 'Worker stopped heartbeating' "
+                "WHERE status = 'claimed' AND heartbeat_at < ? AND attempts >= ?",
+                (now - self.lease_seconds, self.max_attempts),
+            )
+            row = self._connection.execute(
+                "SELECT unit, year, month FROM units WHERE status = 'pending' OR (status = 'claimed' AND heartbeat_at < ?) ORDER BY unit LIMIT 1",
+                (now - self.lease_seconds,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE units SET status = 'claimed', worker = ?, heartbeat_at = ?, attempts = attempts + 1 WHERE unit = ?",
+                (worker_id, now, row[0]),
+            )
+        return row
+
+    def heartbeat(self, unit: str, worker_id: str) -> bool:
+        """Extends the worker's lease on the unit, returning False if another worker has taken it over."""
+        with self._transaction():
+            updated = self._connection.execute(
+                "UPDATE units SET heartbeat_at = ? WHERE unit = ? AND worker = ? AND status = 'claimed'",
+                (time.time(), unit, worker_id),
+            ).rowcount
+        return updated == 1
+
+    def complete(self, unit: str, worker_id: str) -> bool:
+        """Marks the unit done, returning False if the worker no longer held it."""
+        with self._transaction():
+            updated = self._connection.execute(
+                "UPDATE units SET status = 'done', error = NULL, finished_at = ? WHERE unit = ? AND worker = ? AND status = 'claimed'",
+                (time.time(), unit, worker_id),
+            ).rowcount
+        return updated == 1
+
+    def release(self, unit: str, worker_id: str, error: str = None):
+        """Returns a unit the worker could not finish to the queue, or marks it failed after max_attempts."""
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE units SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, worker = NULL, heartbeat_at = NULL, error = ? "
+                "WHERE unit = ? AND worker = ?",
+                (self.max_attempts, error, unit, worker_id),
+            )
+
+    @contextmanager
+    def keep_alive(self, unit: str, worker_id: str):
+        """Heartbeats the unit from a background thread while the enclosed work runs.
+        Yields an event that is set when the lease is lost, because another worker took the unit over or
+        no heartbeat got through for lease_seconds, after which the work should stop."""
+        stopped = threading.Event()
+        lease_lost = threading.Event()
+
+        def beat():
+            last_beat = time.monotonic()
+            interval = self.lease_seconds / 4
+            while not stopped.wait(interval):
+                try:
+                    kept = self.heartbeat(unit, worker_id)
+                except sqlite3.Error as e:
+                    kept = None
+                    print(f"Heartbeat for {unit} failed ({e}), retrying")
+                if kept:
+                    last_beat = time.monotonic()
+                    interval = self.lease_seconds / 4
+                elif kept is None and time.monotonic() - last_beat < self.lease_seconds:
+                    interval = min(HEARTBEAT_RETRY_SECONDS, self.lease_seconds / 4)
+                else:
+                    print(f"\033[91m❌ Lease on {unit} was lost, another worker may be working on it\033[0m")
+                    lease_lost.set()
+                    return
+
+        thread = threading.Thread(target=beat, name=f"heartbeat-{unit}", daemon=True)
+        thread.start()
+        try:
+            yield lease_lost
+        finally:
+            stopped.set()
+            thread.join()
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._connection.execute("SELECT status, count(*) FROM units GROUP BY status").fetchall())
+
+    def failed_units(self) -> List[Tuple[str, str]]:
+        with self._lock:
+            return self._connection.execute("SELECT unit, error FROM units WHERE status = 'failed' ORDER BY unit").fetchall()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
@@ -0,0 +1,55 @@
+import pytest
+
+from src.download.html_scraper import HTML_SCRAPERS, create_html_scraper
+
+REFERENCE_SCRAPER = "soup"
+
+# Markup the website has used or could, each scraper must read it as BeautifulSoup does
+EDGE_CASE_PAGES = [
+    '<div class="view-item odd"><a href="/council/whats-on/a"> Full Council &amp; Budget </a><time class="datetime" datetime="2024-01-02T10:00:00Z">10:00</time></div>',
+    '<div class="view-item"><a href="/council/whats-on/b">PRIVATE Meeting</a><a href="/council/whats-on/c">Planning Committee</a><time class="datetime" datetime="2024-01-03T10:00:00Z"></time></div>',
+    '<div class="view-item"><a href="/elsewhere">Other link</a><time class="datetime" datetime="2024-01-05T10:00:00Z"></time></div>',
+    '<div class="view-item"><a href="/council/whats-on/e">No time</a></div>',
+    '<div class="view-item"><a href="/council/whats-on/f"><span> Nested Name </span></a><time class="datetime" datetime="2024-01-06T10:00:00Z"></time></div>',
+    '<div class="view-item"><a href="/council/whats-on/g"><span>Split</span> Name</a><a href="/council/whats-on/h"><!-- Comment --></a><time class="datetime" datetime="2024-01-07T10:00:00Z"></time></div>',
+    '<ul><li><a href="https://example.org/a.pdf">Agenda</a></li><li><a href="https://example.org/b.pdf"> Minutes <!-- draft --></a></li>'
+    '<li><a href="https://example.org/c.pdf"><strong>Appendix</strong></a></li><li><a href="https://example.org/d.pdf"></a></li>'
+    '<li><a href="https://example.org/e.PDF">Upper case</a></li><li><a href="https://example.org/f.pdf">Report &amp; Accounts</a></li>'
+    '<li><a href="https://example.org/g.pdf"><!-- Comment --></a></li></ul>',
+    '',
+]
+
+
+def _scraper(name: str):
+    try:
+        return create_html_scraper(name)
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+
+
+@pytest.mark.parametrize("name", [name for name in HTML_SCRAPERS if name != REFERENCE_SCRAPER])
+@pytest.mark.parametrize("html", EDGE_CASE_PAGES)
+def test_scraper_reads_pages_as_beautifulsoup_does(name, html):
+    scraper = _scraper(name)
+    reference = create_html_scraper(REFERENCE_SCRAPER)
+    assert scraper.calendar_items(html) == reference.calendar_items(html)
+    assert scraper.pdf_links(html) == reference.pdf_links(html)
+
+
+@pytest.mark.parametrize("name", HTML_SCRAPERS)
+def test_calendar_items_skip_private_meetings_and_nested_markup(name):
+    scraper = _scraper(name)
+    assert scraper.calendar_items(EDGE_CASE_PAGES[1]) == [("Planning Committee", "/council/whats-on/c", "2024-01-03T10:00:00Z")]
+    assert scraper.calendar_items(EDGE_CASE_PAGES[4]) == [(" Nested Name ", "/council/whats-on/f", "2024-01-06T10:00:00Z")]
+
+
+@pytest.mark.parametrize("name", HTML_SCRAPERS)
+def test_pdf_links_without_a_single_string_have_no_text(name):
+    links = _scraper(name).pdf_links(EDGE_CASE_PAGES[6])
+    assert links[:4] == [
+        ("Agenda", "https://example.org/a.pdf"),
+        (None, "https://example.org/b.pdf"),
+        ("Appendix", "https://example.org/c.pdf"),
+        (None, "https://example.org/d.pdf"),
+    ]
+    assert ("Upper case", "https://example.org/e.PDF") not in links
@@ -0,0 +1,123 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.download.blob_store import BlobStore
+from src.download.pdf_downloader import download_pdf_to_folder
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 64
+PARTIAL_SIZE = 1000
+ETAG = '"v1"'
+
+
+class RangeServer(ThreadingHTTPServer):
+    """Serves one file with an ETag, answering Range requests the way mode says. Records each request's range headers."""
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RangeHandler)
+        self.content = CONTENT
+        self.etag = ETAG
+        self.mode = "ranges"
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/file.pdf"
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        requested_range = self.headers.get("Range")
+        server.requests.append((requested_range, self.headers.get("If-Range")))
+        if requested_range and server.mode == "unsatisfiable":
+            self._respond(416, b"", {"Content-Range": f"bytes */{len(server.content)}"})
+        elif requested_range and server.mode == "whole_range":
+            self._respond(206, server.content, {"Content-Range": f"bytes 0-{len(server.content) - 1}/{len(server.content)}"})
+        elif requested_range and server.mode == "ranges" and self.headers.get("If-Range") == server.etag:
+            start = int(requested_range[len("bytes="):].rstrip("-"))
+            self._respond(206, server.content[start:], {"Content-Range": f"bytes {start}-{len(server.content) - 1}/{len(server.content)}"})
+        else:
+            self._respond(200, server.content, {})
+
+    def _respond(self, status: int, body: bytes, headers: dict):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", self.server.etag)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = RangeServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def blob_store(tmp_path):
+    return BlobStore(str(tmp_path / "store"))
+
+
+def _interrupted_download(blob_store: BlobStore, url: str, content: bytes = CONTENT, validator: str = ETAG):
+    """Leaves a partial download of url in the store, as a dropped connection does."""
+    blob_store.temp_path(url).write_bytes(content[:PARTIAL_SIZE])
+    blob_store.save_partial_validator(url, validator)
+
+
+def _download(server: RangeServer, blob_store: BlobStore, tmp_path) -> bytes:
+    sha256 = download_pdf_to_folder(server.url, "file.pdf", tmp_path / "meeting", blob_store)
+    downloaded = (tmp_path / "meeting" / "file.pdf").read_bytes()
+    assert sha256 == hashlib.sha256(downloaded).hexdigest()
+    assert not blob_store.temp_path(server.url).exists()
+    assert blob_store.partial_validator(server.url) is None
+    return downloaded
+
+
+def test_resumes_a_partial_download(server, blob_store, tmp_path):
+    _interrupted_download(blob_store, server.url)
+
+    assert _download(server, blob_store, tmp_path) == CONTENT
+    assert server.requests == [(f"bytes={PARTIAL_SIZE}-", ETAG)]
+
+
+def test_replaces_the_partial_download_when_the_server_ignores_range(server, blob_store, tmp_path):
+    server.mode = "ignore"
+    _interrupted_download(blob_store, server.url)
+
+    assert _download(server, blob_store, tmp_path) == CONTENT
+    assert server.requests == [(f"bytes={PARTIAL_SIZE}-", ETAG)]
+
+
+def test_starts_again_when_the_range_is_unsatisfiable(server, blob_store, tmp_path):
+    server.mode = "unsatisfiable"
+    _interrupted_download(blob_store, server.url)
+
+    assert _download(server, blob_store, tmp_path) == CONTENT
+    assert server.requests == [(f"bytes={PARTIAL_SIZE}-", ETAG), (None, None)]
+
+
+def test_downloads_the_new_file_when_it_changed_since_the_partial_download(server, blob_store, tmp_path):
+    _interrupted_download(blob_store, server.url, content=b"%PDF-1.4 old version " * 100, validator='"v0"')
+
+    assert _download(server, blob_store, tmp_path) == CONTENT
+    assert server.requests == [(f"bytes={PARTIAL_SIZE}-", '"v0"')]
+
+
+def test_starts_again_when_the_server_answers_with_another_range(server, blob_store, tmp_path):
+    server.mode = "whole_range"
+    _interrupted_download(blob_store, server.url)
+
+    assert _download(server, blob_store, tmp_path) == CONTENT
+    assert server.requests == [(f"bytes={PARTIAL_SIZE}-", ETAG), (None, None)]
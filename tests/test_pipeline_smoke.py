@@ -0,0 +1,52 @@
+import os
+import signal
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("fitz")
+from benchmarks.fixtures import SiteFixtures
+from benchmarks.server import BenchmarkServer
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEETINGS_PER_MONTH = 2
+
+
+@pytest.fixture
+def server():
+    server = BenchmarkServer(latency_seconds=0.01)
+    server.fixtures = SiteFixtures(server.base_url, datetime(2024, 1, 1), months=2, meetings_per_month=MEETINGS_PER_MONTH, pages_per_pdf=2)
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_pipeline_with_process_workers_finishes(server, tmp_path):
+    """Processing workers are started while download threads run, which used to deadlock forked workers."""
+    command = [
+        sys.executable, os.path.join(REPO_FOLDER, "main.py"),
+        "--pipeline", "--process-workers", "2",
+        "--start-year", "2024", "--start-month", "1", "--end-year", "2024", "--end-month", "2",
+        "--file-filter", "agenda",
+        "--download-location", str(tmp_path / "downloaded"),
+        "--output-location", str(tmp_path / "processed"),
+        "--logs-location", str(tmp_path / "logs"),
+        "--cache-location", str(tmp_path / "cache"),
+        "--search-index-location", str(tmp_path / "search.sqlite"),
+    ]
+    environment = dict(os.environ, LIMERICK_BASE_URL=server.base_url, PYTHONPATH=REPO_FOLDER)
+    # A new session lets a hung run be killed together with its workers
+    process = subprocess.Popen(command, cwd=tmp_path, env=environment, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, start_new_session=True)
+    try:
+        _, stderr = process.communicate(timeout=120)
+    except subprocess.TimeoutExpired:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        pytest.fail("pipeline mode did not finish within 120 seconds")
+
+    assert process.returncode == 0, stderr
+    agendas = [os.path.join(folder, name) for folder, _, names in os.walk(tmp_path / "processed") for name in names if name == "Agenda.md"]
+    assert len(agendas) == 2 * MEETINGS_PER_MONTH
+    assert not [name for _, _, names in os.walk(tmp_path / "processed") for name in names if name.endswith(".tmp")]
@@ -0,0 +1,27 @@
+from src.search.search_index import SearchIndex
+
+MEETING = {"meeting_name": "Full Council", "datetime": "2024-01-02 10:00:00", "href": "https://example.org/meeting"}
+
+
+def test_pages_keep_their_numbers_when_the_text_has_rules(tmp_path):
+    """A "---" line in a page's text used to split it, shifting the page numbers of every later page."""
+    search_index = SearchIndex(str(tmp_path / "search.sqlite"), str(tmp_path))
+    page_texts = ["Agenda\n\n---\nHousing report\n---\n", "Roads programme\n---\n", "\n---\n", "Planning application\n---\n"]
+    search_index.add_document(str(tmp_path / "Agenda.md"), "source", MEETING, "Agenda.pdf", "https://example.org/agenda.pdf", page_texts)
+
+    assert [result["page"] for result in search_index.search("housing")] == [1]
+    assert [result["page"] for result in search_index.search("roads")] == [2]
+    assert [result["page"] for result in search_index.search("planning")] == [4]
+    search_index.close()
+
+
+def test_adding_a_document_again_replaces_its_pages(tmp_path):
+    search_index = SearchIndex(str(tmp_path / "search.sqlite"), str(tmp_path))
+    md_path = str(tmp_path / "Agenda.md")
+    search_index.add_document(md_path, "old", MEETING, "Agenda.pdf", None, ["Housing report\n---\n"])
+    search_index.add_document(md_path, "new", MEETING, "Agenda.pdf", None, ["Roads programme\n---\n"])
+
+    assert search_index.search("housing") == []
+    assert len(search_index.search("roads")) == 1
+    assert search_index.is_current(md_path, "new")
+    search_index.close()
@@ -0,0 +1,86 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from src.work_queue.work_queue import WorkQueue
+
+LEASE_SECONDS = 0.2
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "work_queue.sqlite"), lease_seconds=LEASE_SECONDS, max_attempts=2)
+    queue.add_months(datetime(2024, 1, 1), datetime(2024, 1, 1))
+    yield queue
+    queue.close()
+
+
+def _expire_lease():
+    time.sleep(LEASE_SECONDS * 1.5)
+
+
+def test_claimed_month_is_not_claimed_again_while_leased(queue):
+    assert queue.claim("a") == ("2024-01", 2024, 1)
+    assert queue.claim("b") is None
+
+
+def test_month_is_claimed_again_after_its_lease_expires(queue):
+    queue.claim("a")
+    _expire_lease()
+
+    assert queue.claim("b") == ("2024-01", 2024, 1)
+    assert queue.status_counts() == {"claimed": 1}
+
+
+def test_worker_that_lost_its_lease_cannot_heartbeat_or_complete(queue):
+    queue.claim("a")
+    _expire_lease()
+    queue.claim("b")
+
+    assert not queue.heartbeat("2024-01", "a")
+    assert not queue.complete("2024-01", "a")
+    assert queue.heartbeat("2024-01", "b")
+    assert queue.complete("2024-01", "b")
+    assert queue.status_counts() == {"done": 1}
+
+
+def test_keep_alive_reports_a_lease_taken_over(queue):
+    queue.claim("a")
+    _expire_lease()
+    queue.claim("b")
+
+    with queue.keep_alive("2024-01", "a") as lease_lost:
+        assert lease_lost.wait(LEASE_SECONDS * 5)
+
+
+def test_month_fails_once_its_workers_stop_heartbeating_max_attempts_times(queue):
+    queue.claim("a")
+    _expire_lease()
+    queue.claim("b")
+    _expire_lease()
+
+    assert queue.claim("c") is None
+    assert queue.status_counts() == {"failed": 1}
+    assert queue.failed_units() == [("2024-01", "Worker stopped heartbeating")]
+
+
+def test_month_fails_once_released_max_attempts_times(queue):
+    queue.claim("a")
+    queue.release("2024-01", "a", "first error")
+    assert queue.status_counts() == {"pending": 1}
+
+    queue.claim("b")
+    queue.release("2024-01", "b", "second error")
+    assert queue.claim("c") is None
+    assert queue.failed_units() == [("2024-01", "second error")]
+
+
+def test_failed_month_is_queued_again_when_added(queue):
+    queue.claim("a")
+    queue.release("2024-01", "a", "error")
+    queue.claim("b")
+    queue.release("2024-01", "b", "error")
+
+    assert queue.add_months(datetime(2024, 1, 1), datetime(2024, 1, 1)) == 0
+    assert queue.claim("c") == ("2024-01", 2024, 1)